@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+# numpy is imported by the functions below that use it, so starting the app
+# does not pay for it until a chart is drawn
+
+# Activity ranges ending today, in days; None covers all completed tasks
+ACTIVITY_RANGES = {
+    "12 weeks": 84,
+    "1 year": 365,
+    "All time": None
+}
+
+# Heatmap cell colors from no activity to the busiest days
+HEATMAP_COLORS = ["#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39"]
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+# First day of a range ending on today
+def range_start(day_counts, today, days):
+    if days is not None:
+        return today - timedelta(days=days)
+    if not day_counts:
+        return today
+    return min(date.fromisoformat(min(day_counts)), today)
+
+
+# Completions per day from start to end (inclusive) as an array, binned from
+# the per-day aggregates so the cost depends on the number of active days
+def daily_series(day_counts, start, end):
+    import numpy as np
+
+    length = (end - start).days + 1
+    if not day_counts:
+        return np.zeros(length, dtype=np.int64)
+    days = np.array(list(day_counts), dtype="datetime64[D]")
+    counts = np.fromiter(day_counts.values(), dtype=np.int64, count=len(day_counts))
+    offsets = (days - np.datetime64(start, "D")).astype(np.int64)
+    in_range = (offsets >= 0) & (offsets < length)
+    return np.bincount(offsets[in_range], weights=counts[in_range], minlength=length).astype(np.int64)
+
+
+# Series padded to whole Monday-to-Sunday weeks, shaped (weeks, 7).
+# Days outside the range are -1. Also returns the Monday of the first week.
+def week_grid(series, start):
+    import numpy as np
+
+    lead = start.weekday()
+    trail = -(lead + len(series)) % 7
+    padded = np.concatenate([np.full(lead, -1), series, np.full(trail, -1)])
+    return padded.reshape(-1, 7), start - timedelta(days=lead)
+
+
+# Tasks completed per ISO week: list of ("Www", count), oldest first
+def weekly_counts(series, start):
+    import numpy as np
+
+    grid, first_monday = week_grid(series, start)
+    totals = np.where(grid < 0, 0, grid).sum(axis=1)
+    labels = [
+        f"W{(first_monday + timedelta(weeks=i)).isocalendar()[1]:02d}"
+        for i in range(len(totals))
+    ]
+    return list(zip(labels, totals.tolist()))
+
+
+# GitLab-style contribution graph as an HTML table, one column per week
+def heatmap_html(series, start):
+    import numpy as np
+
+    grid, first_monday = week_grid(series, start)
+    cells = grid.T  # rows Mon..Sun
+    max_count = max(int(series.max()) if len(series) else 0, 1)
+    ratio = cells / max_count
+    levels = np.select(
+        [cells <= 0, ratio <= 0.25, ratio <= 0.5, ratio <= 0.75],
+        [0, 1, 2, 3],
+        default=4
+    )
+
+    week_count = cells.shape[1]
+    label_every = 2 if week_count <= 26 else 4
+    html = ['<div style="overflow-x: auto;"><table style="border-collapse: separate; border-spacing: 3px;">']
+    html.append('<tr><td style="width: 30px;"></td>')
+    for i in range(week_count):
+        if i % label_every == 0:
+            week = (first_monday + timedelta(weeks=i)).isocalendar()[1]
+            html.append(f'<td style="text-align: center; font-size: 0.7em; color: #666;">{week:02d}</td>')
+        else:
+            html.append('<td></td>')
+    html.append('</tr>')
+
+    for day_idx, day in enumerate(DAY_NAMES):
+        html.append(f'<tr><td style="font-size: 0.8em; color: #666; text-align: right; padding-right: 5px;">{day}</td>')
+        html.extend(
+            '<td></td>' if count < 0 else
+            f'<td style="width: 12px; height: 12px; background-color: {HEATMAP_COLORS[level]}; '
+            f'border-radius: 2px;" title="{count} tasks"></td>'
+            for count, level in zip(cells[day_idx].tolist(), levels[day_idx].tolist())
+        )
+        html.append('</tr>')
+
+    html.append('</table></div>')
+    return "".join(html)
@@ -1,13 +1,55 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import json
 import os
-import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
+from activity import ACTIVITY_RANGES, daily_series, heatmap_html, range_start, weekly_counts
+from export import CATEGORY_LABELS, EXPORT_FORMATS, parquet_available
+from importer import IMPORT_FORMATS
+import perf
+from storage import archive_month, query_completed
+from task_store import (
+    DEFAULT_BOARD, TaskStore, board_dir, board_slug, create_board, list_boards, open_board_storage
+)
 
 # Configuration
 DATA_FILE = "tasks_data.json"
 LABELS_CONFIG_FILE = "labels_config.json"
+# "json" rewrites DATA_FILE on every change, "journal" appends to JOURNAL_FILE,
+# "sqlite" stores one row per task in SQLITE_FILE
+STORAGE_BACKEND = os.environ.get("EISENHOWER_STORAGE", "json")
+JOURNAL_FILE = "tasks_journal.jsonl"
+SQLITE_FILE = "tasks_data.db"
+# Every board keeps its data files in its own directory under DATA_DIR; the
+# default board uses DATA_DIR itself. With EISENHOWER_PARTITION_BY_USER=1
+# each signed-in user gets their own boards under DATA_DIR/users/.
+DATA_DIR = os.environ.get("EISENHOWER_DATA_DIR", ".")
+PARTITION_BY_USER = os.environ.get("EISENHOWER_PARTITION_BY_USER") == "1"
+# Request header carrying the user name, for proxies other than Posit Connect.
+# Only set it when a trusted proxy always sets or strips that header.
+USER_HEADER = os.environ.get("EISENHOWER_USER_HEADER", "")
+# Posit Connect sets RSTUDIO_PRODUCT (POSIT_PRODUCT in newer releases) for
+# the content it runs; only there is its credentials header trustworthy
+ON_POSIT_CONNECT = "CONNECT" in (os.environ.get("POSIT_PRODUCT"), os.environ.get("RSTUDIO_PRODUCT"))
+# Board stores kept in memory per process
+BOARD_STORE_CACHE_SIZE = 64
+# Number of tasks rendered per page in each quadrant
+QUADRANT_PAGE_SIZE = int(os.environ.get("EISENHOWER_PAGE_SIZE", "20"))
+# and in the Completed tab
+COMPLETED_PAGE_SIZE = QUADRANT_PAGE_SIZE
+# Most search results shown at once
+SEARCH_RESULT_LIMIT = 20
+COMPLETED_SORTS = {
+    "Newest first": "newest",
+    "Oldest first": "oldest",
+    "Category": "category"
+}
+# Opt-in run profiling: EISENHOWER_PROFILE=1 turns it on for every session,
+# ?profile=1 in the URL for one. Profiles are shown in the sidebar and
+# appended to PROFILE_LOG_FILE as JSON lines (an empty name disables the log).
+PROFILE_ALL_SESSIONS = os.environ.get("EISENHOWER_PROFILE") == "1"
+PROFILE_LOG_FILE = os.environ.get("EISENHOWER_PROFILE_LOG", "perf_log.jsonl")
 
 # Load labels configuration
 def load_labels_config():
@@ -38,6 +80,31 @@ def initialize_labels():
     }
     return default_labels, default_colors, True
 
+# The signed-in user's name, or None. Streamlit's own authentication
+# (st.user) comes first. Posit Connect passes the user in the
+# RStudio-Connect-Credentials header, other proxies in USER_HEADER; headers
+# are only read where such a proxy is known to set them, since clients can
+# send any header themselves.
+def current_user():
+    user_info = getattr(st, "user", None)
+    if user_info is not None and user_info.get("is_logged_in") and user_info.get("email"):
+        return user_info.get("email")
+    headers = st.context.headers
+    credentials = headers.get("Rstudio-Connect-Credentials") if ON_POSIT_CONNECT else None
+    if credentials:
+        try:
+            user = json.loads(credentials).get("user")
+        except (ValueError, AttributeError):
+            user = None
+        if user:
+            return user
+    if USER_HEADER and headers.get(USER_HEADER):
+        return headers.get(USER_HEADER)
+    return None
+
+# Profile this run when enabled; phases below are no-ops otherwise
+perf.start_run(PROFILE_ALL_SESSIONS or st.query_params.get("profile") == "1", PROFILE_LOG_FILE)
+
 # Initialize session state
 if "tasks" not in st.session_state:
     st.session_state.tasks = {
@@ -55,7 +122,8 @@ if "dark_mode" not in st.session_state:
     st.session_state.dark_mode = False
 
 if "available_labels" not in st.session_state:
-    default_labels, label_colors_map, auto_gen = initialize_labels()
+    with perf.phase("labels_init"):
+        default_labels, label_colors_map, auto_gen = initialize_labels()
     st.session_state.available_labels = default_labels
     st.session_state.label_colors = label_colors_map
     st.session_state.auto_generate_colors = auto_gen
@@ -68,158 +136,92 @@ if "active_filters" not in st.session_state:
         "not_urgent_not_important": set()
     }
 
+if "quadrant_pages" not in st.session_state:
+    st.session_state.quadrant_pages = {
+        "urgent_important": 0,
+        "not_urgent_important": 0,
+        "urgent_not_important": 0,
+        "not_urgent_not_important": 0
+    }
+
+if "filter_match_all" not in st.session_state:
+    st.session_state.filter_match_all = {
+        "urgent_important": False,
+        "not_urgent_important": False,
+        "urgent_not_important": False,
+        "not_urgent_not_important": False
+    }
+
+if "show_archived_completed" not in st.session_state:
+    st.session_state.show_archived_completed = False
+
+if "completed_page" not in st.session_state:
+    st.session_state.completed_page = 0
+
+# Tasks selected for bulk actions: id -> None per quadrant, and
+# id -> archive month for completed tasks
+if "selected_tasks" not in st.session_state:
+    st.session_state.selected_tasks = {
+        "urgent_important": {},
+        "not_urgent_important": {},
+        "urgent_not_important": {},
+        "not_urgent_not_important": {}
+    }
+    st.session_state.selected_completed = {}
+
+if "export_ready" not in st.session_state:
+    st.session_state.export_ready = None
+
+if "import_result" not in st.session_state:
+    st.session_state.import_result = None
+
+if "board" not in st.session_state:
+    st.session_state.board = DEFAULT_BOARD
+
+# Users without a name (local runs, anonymous access) share the common boards
+board_user = current_user() if PARTITION_BY_USER else None
+
+# One store per board and process, shared by all sessions and reruns on that
+# board. Each board has its own lock, so boards never wait for each other.
+@st.cache_resource(show_spinner=False, max_entries=BOARD_STORE_CACHE_SIZE)
+def get_board_store(directory):
+    _, label_colors_map, _ = initialize_labels()
+    storage = open_board_storage(STORAGE_BACKEND, directory, DATA_FILE, JOURNAL_FILE, SQLITE_FILE)
+    return TaskStore(storage, default_label_colors=label_colors_map)
+
+store_dir = str(board_dir(DATA_DIR, st.session_state.board, board_user))
+store = get_board_store(store_dir)
+
+# Cache key for values derived from the current board's data. A store that
+# was evicted and opened again counts versions from the start, so the key
+# names the store object rather than the board directory.
+def data_version():
+    return (store.instance, store.version)
+
 # Load tasks from file
 def load_tasks():
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, "r") as f:
-                data = json.load(f)
-                st.session_state.tasks = data.get("tasks", st.session_state.tasks)
-                st.session_state.completed_tasks = data.get("completed_tasks", [])
-                
-                # Load label colors if they exist, otherwise keep config defaults
-                if "label_colors" in data:
-                    # Merge saved colors with config colors (config takes precedence for defaults)
-                    saved_colors = data.get("label_colors", {})
-                    st.session_state.label_colors.update(saved_colors)
-        except Exception as e:
-            st.error(f"Error loading tasks: {e}")
+    try:
+        data = store.refresh()
+    except Exception as e:
+        st.error(f"Error loading tasks: {e}")
+        return
+    # Sessions share the store's data instead of holding their own copy
+    st.session_state.tasks = data["tasks"]
+    st.session_state.completed_tasks = data["completed_tasks"]
+    st.session_state.label_colors = data["label_colors"]
 
-# Save tasks to file
-def save_tasks():
+# Run a TaskStore mutation and pick up its result; storage errors are
+# reported instead of raised. Returns the mutation's result, or False.
+def update_store(mutation, *args, **kwargs):
     try:
-        data = {
-            "tasks": st.session_state.tasks,
-            "completed_tasks": st.session_state.completed_tasks,
-            "label_colors": st.session_state.label_colors
-        }
-        with open(DATA_FILE, "w") as f:
-            json.dump(data, f, indent=2)
+        with perf.phase("save_tasks"):
+            result = mutation(*args, **kwargs)
     except Exception as e:
         st.error(f"Error saving tasks: {e}")
-
-# Add task
-def add_task(category, task_name, task_description, due_date=None, labels=None):
-    if task_name.strip():
-        task = {
-            "id": datetime.now().strftime("%Y%m%d%H%M%S%f"),
-            "name": task_name.strip(),
-            "description": task_description.strip() if task_description else "",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "due_date": due_date.strftime("%Y-%m-%d") if due_date else None,
-            "priority": len(st.session_state.tasks[category]),  # Add at end by default
-            "labels": labels if labels else []
-        }
-        st.session_state.tasks[category].append(task)
-        save_tasks()
-        return True
-    return False
-
-# Edit task
-def edit_task(category, task_id, new_name, new_description, new_due_date=None, new_labels=None):
-    task_list = st.session_state.tasks[category]
-    for task in task_list:
-        if task["id"] == task_id:
-            task["name"] = new_name.strip()
-            task["description"] = new_description.strip() if new_description else ""
-            task["due_date"] = new_due_date.strftime("%Y-%m-%d") if new_due_date else None
-            task["labels"] = new_labels if new_labels else []
-            save_tasks()
-            return True
-    return False
-
-# Move task to different category
-def move_task(from_category, to_category, task_id):
-    task_list = st.session_state.tasks[from_category]
-    task_to_move = None
-    
-    for i, task in enumerate(task_list):
-        if task["id"] == task_id:
-            task_to_move = task_list.pop(i)
-            break
-    
-    if task_to_move:
-        task_to_move["priority"] = len(st.session_state.tasks[to_category])
-        st.session_state.tasks[to_category].append(task_to_move)
-        # Reindex priorities in source category
-        for idx, task in enumerate(st.session_state.tasks[from_category]):
-            task["priority"] = idx
-        save_tasks()
-        return True
-    return False
-
-# Move task up in priority
-def move_task_up(category, task_id):
-    task_list = st.session_state.tasks[category]
-    for i, task in enumerate(task_list):
-        if task["id"] == task_id and i > 0:
-            task_list[i], task_list[i-1] = task_list[i-1], task_list[i]
-            # Update priorities
-            for idx, t in enumerate(task_list):
-                t["priority"] = idx
-            save_tasks()
-            return True
-    return False
-
-# Move task down in priority
-def move_task_down(category, task_id):
-    task_list = st.session_state.tasks[category]
-    for i, task in enumerate(task_list):
-        if task["id"] == task_id and i < len(task_list) - 1:
-            task_list[i], task_list[i+1] = task_list[i+1], task_list[i]
-            # Update priorities
-            for idx, t in enumerate(task_list):
-                t["priority"] = idx
-            save_tasks()
-            return True
-    return False
-
-# Complete task
-def complete_task(category, task_id):
-    task_list = st.session_state.tasks[category]
-    task_to_complete = None
-    
-    for i, task in enumerate(task_list):
-        if task["id"] == task_id:
-            task_to_complete = task_list.pop(i)
-            break
-    
-    if task_to_complete:
-        task_to_complete["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        task_to_complete["category"] = category
-        # Ensure backward compatibility with old 'text' field
-        if "text" in task_to_complete and "name" not in task_to_complete:
-            task_to_complete["name"] = task_to_complete["text"]
-        st.session_state.completed_tasks.append(task_to_complete)
-        save_tasks()
-
-# Delete task
-def delete_task(category, task_id):
-    task_list = st.session_state.tasks[category]
-    st.session_state.tasks[category] = [t for t in task_list if t["id"] != task_id]
-    save_tasks()
-
-# Delete completed task
-def delete_completed_task(task_id):
-    st.session_state.completed_tasks = [t for t in st.session_state.completed_tasks if t["id"] != task_id]
-    save_tasks()
-
-# Check if task is overdue
-def is_overdue(due_date_str):
-    if not due_date_str:
         return False
-    from datetime import datetime as dt
-    due_date = dt.strptime(due_date_str, "%Y-%m-%d")
-    return due_date.date() < dt.now().date()
-
-# Get days until due
-def days_until_due(due_date_str):
-    if not due_date_str:
-        return None
-    from datetime import datetime as dt
-    due_date = dt.strptime(due_date_str, "%Y-%m-%d")
-    delta = (due_date.date() - dt.now().date()).days
-    return delta
+    # A merge with another process's changes may have replaced the data
+    load_tasks()
+    return result
 
 # Get label color
 def get_label_color(label):
@@ -236,28 +238,15 @@ def get_label_color(label):
         b = hash_val & 255
         color = f"#{r:02x}{g:02x}{b:02x}"
         # Save it for consistency
-        st.session_state.label_colors[label] = color
+        store.set_label_color(label, color)
         return color
     
     # Fallback color if auto-generate is disabled
     return "#808080"
 
-# Filter tasks by active labels
-def filter_tasks_by_labels(tasks, active_filters):
-    if not active_filters:
-        return tasks
-    
-    filtered = []
-    for task in tasks:
-        task_labels = set(task.get("labels", []))
-        # Show task if it has any of the active filter labels
-        if task_labels.intersection(active_filters):
-            filtered.append(task)
-    
-    return filtered
-
 # Load tasks on startup
-load_tasks()
+with perf.phase("load_tasks"):
+    load_tasks()
 
 # Page configuration
 st.set_page_config(
@@ -308,354 +297,676 @@ else:
 st.markdown("---")
 
 
-# Create tabs
-tab1, tab2, tab3 = st.tabs(["📋 Active Tasks", "✅ Completed Tasks", "📊 Statistics"])
+# Forget the view state of the previous board when switching boards
+def reset_board_view():
+    st.session_state.editing_task = None
+    for category in st.session_state.quadrant_pages:
+        st.session_state.quadrant_pages[category] = 0
+        st.session_state.active_filters[category] = set()
+        st.session_state.selected_tasks[category] = {}
+    st.session_state.selected_completed = {}
+    st.session_state.completed_page = 0
+    st.session_state.show_archived_completed = False
+    st.session_state.export_ready = None
+    st.session_state.import_result = None
 
-# Tab 1: Active Tasks (Eisenhower Matrix)
-with tab1:
-    # Category definitions
-    categories = {
-        "urgent_important": {
-            "title": "🔥 Urgent & Important",
-            "description": "Do First - Critical tasks that require immediate attention",
-            "color": "#ff4b4b"
-        },
-        "not_urgent_important": {
-            "title": "📅 Not Urgent & Important",
-            "description": "Schedule - Important tasks for long-term success",
-            "color": "#4b7bff"
-        },
-        "urgent_not_important": {
-            "title": "⚡ Urgent & Not Important",
-            "description": "Delegate - Tasks that are urgent but not critical",
-            "color": "#ffa500"
-        },
-        "not_urgent_not_important": {
-            "title": "🗑️ Not Urgent & Not Important",
-            "description": "Eliminate - Tasks with minimal value",
-            "color": "#808080"
-        }
+# Create the board named in the sidebar form and switch to it
+def add_board():
+    name = st.session_state.new_board_name
+    if not board_slug(name):
+        st.session_state.board_error = "Board names need at least one letter or digit."
+        return
+    st.session_state.board = create_board(DATA_DIR, name, board_user)
+    st.session_state.new_board_name = ""
+    st.session_state.board_error = None
+    reset_board_view()
+
+# Board picker: list, switch and create boards
+with st.sidebar:
+    st.subheader("🗂️ Boards")
+    if board_user is not None:
+        st.caption(f"Signed in as {board_user}")
+    st.selectbox("Board", list_boards(DATA_DIR, board_user), key="board", on_change=reset_board_view)
+    with st.form("new_board_form", border=False):
+        st.text_input("New board", key="new_board_name", placeholder="Board name")
+        st.form_submit_button("➕ Create board", on_click=add_board, use_container_width=True)
+    if st.session_state.get("board_error"):
+        st.warning(st.session_state.board_error)
+
+# Category definitions
+categories = {
+    "urgent_important": {
+        "title": "🔥 Urgent & Important",
+        "description": "Do First - Critical tasks that require immediate attention",
+        "color": "#ff4b4b"
+    },
+    "not_urgent_important": {
+        "title": "📅 Not Urgent & Important",
+        "description": "Schedule - Important tasks for long-term success",
+        "color": "#4b7bff"
+    },
+    "urgent_not_important": {
+        "title": "⚡ Urgent & Not Important",
+        "description": "Delegate - Tasks that are urgent but not critical",
+        "color": "#ffa500"
+    },
+    "not_urgent_not_important": {
+        "title": "🗑️ Not Urgent & Not Important",
+        "description": "Eliminate - Tasks with minimal value",
+        "color": "#808080"
     }
+}
 
-    # Create two rows of two columns
-    row1_col1, row1_col2 = st.columns(2)
-    row2_col1, row2_col2 = st.columns(2)
-
-    columns = [row1_col1, row1_col2, row2_col1, row2_col2]
-    category_keys = list(categories.keys())
-
-    # Render each quadrant
-    for idx, (category_key, category_info) in enumerate(categories.items()):
-        with columns[idx]:
-            # Category header with background color
-            st.markdown(
-                f"""
-                <div style="background-color: {category_info['color']}; padding: 15px; border-radius: 10px; margin-bottom: 10px;">
-                    <h3 style="color: white; margin: 0;">{category_info['title']}</h3>
-                    <p style="color: white; margin: 5px 0 0 0; font-size: 0.9em;">{category_info['description']}</p>
-                </div>
-                """,
-                unsafe_allow_html=True
+
+# Rerun only the current fragment. A click handled during a full app run
+# (e.g. right after another widget triggered one) falls back to an app rerun.
+def rerun_fragment():
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+# Selection checkbox for bulk actions. Selections are kept in a dict rather
+# than widget state so they survive paging and filtering.
+def selection_checkbox(selection, task_id, value=None):
+    key = f"select_{task_id}"
+    if key not in st.session_state:
+        st.session_state[key] = task_id in selection
+    st.checkbox("Select", key=key, on_change=update_selection, args=(selection, task_id, value))
+
+def update_selection(selection, task_id, value):
+    if st.session_state[f"select_{task_id}"]:
+        selection[task_id] = value
+    else:
+        selection.pop(task_id, None)
+
+# Select or unselect tasks given as {task id: value}
+def set_selection(selection, tasks, selected):
+    for task_id, value in tasks.items():
+        st.session_state[f"select_{task_id}"] = selected
+        if selected:
+            selection[task_id] = value
+        else:
+            selection.pop(task_id, None)
+
+# Bulk action bar of a quadrant for the selected tasks
+def render_bulk_actions(category_key, selection, page_tasks):
+    col_page, col_clear = st.columns(2)
+    with col_page:
+        if st.button("Select page", key=f"bulk_select_page_{category_key}", use_container_width=True):
+            set_selection(selection, {task["id"]: None for task in page_tasks}, True)
+    with col_clear:
+        if st.button("Clear selection", key=f"bulk_clear_{category_key}", use_container_width=True):
+            set_selection(selection, dict(selection), False)
+    
+    count = len(selection)
+    st.caption(f"{count} selected")
+    
+    col_done, col_delete = st.columns(2)
+    with col_done:
+        if st.button(f"✓ Complete ({count})", key=f"bulk_complete_{category_key}", use_container_width=True, disabled=not count):
+            update_store(store.bulk_complete_tasks, category_key, list(selection))
+            selection.clear()
+            st.rerun()
+    with col_delete:
+        if st.button(f"🗑️ Delete ({count})", key=f"bulk_delete_{category_key}", use_container_width=True, disabled=not count):
+            update_store(store.bulk_delete_tasks, category_key, list(selection))
+            selection.clear()
+            st.rerun()
+    
+    move_col, move_button_col = st.columns([2, 1])
+    with move_col:
+        move_target = st.selectbox(
+            "Move selected to",
+            [key for key in categories if key != category_key],
+            format_func=lambda key: categories[key]["title"],
+            key=f"bulk_move_target_{category_key}"
+        )
+    with move_button_col:
+        if st.button("↔️ Move", key=f"bulk_move_{category_key}", use_container_width=True, disabled=not count):
+            update_store(store.bulk_move_tasks, category_key, move_target, list(selection))
+            selection.clear()
+            st.rerun()
+    
+    bulk_labels = st.multiselect(
+        "Labels for selected",
+        options=st.session_state.available_labels,
+        key=f"bulk_labels_{category_key}"
+    )
+    col_add, col_remove = st.columns(2)
+    with col_add:
+        if st.button("🏷️ Add labels", key=f"bulk_add_labels_{category_key}", use_container_width=True, disabled=not (count and bulk_labels)):
+            update_store(store.bulk_relabel_tasks, category_key, list(selection), add_labels=bulk_labels)
+            st.rerun()
+    with col_remove:
+        if st.button("✖️ Remove labels", key=f"bulk_remove_labels_{category_key}", use_container_width=True, disabled=not (count and bulk_labels)):
+            update_store(store.bulk_relabel_tasks, category_key, list(selection), remove_labels=bulk_labels)
+            st.rerun()
+
+# Render one quadrant of the matrix. Runs as a fragment: filtering, paging and
+# reordering rerun only this quadrant, while changes that show up in other
+# quadrants or tabs (add, edit, move, complete, delete) rerun the whole app.
+@st.fragment
+@perf.profiled("quadrant {0}")
+def render_quadrant(category_key, category_info):
+    # Pick up changes made by other sessions since the last full run
+    load_tasks()
+    due_status = store.due_buckets()["status"]
+    
+    # Category header with background color
+    st.markdown(
+        f"""
+        <div style="background-color: {category_info['color']}; padding: 15px; border-radius: 10px; margin-bottom: 10px;">
+            <h3 style="color: white; margin: 0;">{category_info['title']}</h3>
+            <p style="color: white; margin: 5px 0 0 0; font-size: 0.9em;">{category_info['description']}</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    
+    # Add new task
+    with st.form(key=f"form_{category_key}", clear_on_submit=True):
+        new_task_name = st.text_input(
+            "Task Name",
+            key=f"input_name_{category_key}",
+            placeholder="Enter task name..."
+        )
+        new_task_description = st.text_area(
+            "Description (optional)",
+            key=f"input_desc_{category_key}",
+            placeholder="Enter task description...",
+            height=80
+        )
+        new_task_due_date = st.date_input(
+            "Due Date (optional)",
+            key=f"input_due_{category_key}",
+            value=None
+        )
+        new_task_labels = st.multiselect(
+            "Labels (optional)",
+            options=st.session_state.available_labels,
+            key=f"input_labels_{category_key}"
+        )
+        
+        submit = st.form_submit_button("➕ Add Task", use_container_width=True)
+        
+        if submit:
+            if update_store(store.add_task, category_key, new_task_name, new_task_description, new_task_due_date, new_task_labels):
+                st.success("Task added!")
+                st.rerun()
+            else:
+                st.warning("Please enter a task name")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Label filter buttons
+    # Labels used in this category, straight from the label index
+    category_labels_used = store.category_labels(category_key)
+    
+    if category_labels_used:
+        st.markdown("**Filter by labels:**")
+        
+        # Create filter buttons
+        filter_cols = st.columns(min(len(category_labels_used) + 1, 6))
+        
+        # Clear filter button
+        with filter_cols[0]:
+            if st.button("🔄 Clear", key=f"clear_filter_{category_key}", use_container_width=True):
+                st.session_state.active_filters[category_key] = set()
+                rerun_fragment()
+        
+        # Label filter buttons
+        for idx, label in enumerate(category_labels_used):
+            if idx + 1 < len(filter_cols):
+                with filter_cols[idx + 1]:
+                    is_active = label in st.session_state.active_filters[category_key]
+                    button_style = "primary" if is_active else "secondary"
+                    label_color = get_label_color(label)
+                    
+                    if st.button(
+                        f"{'✓ ' if is_active else ''}{label}",
+                        key=f"filter_{category_key}_{label}",
+                        use_container_width=True,
+                        type=button_style
+                    ):
+                        if is_active:
+                            st.session_state.active_filters[category_key].discard(label)
+                        else:
+                            st.session_state.active_filters[category_key].add(label)
+                        rerun_fragment()
+        
+        if len(st.session_state.active_filters[category_key]) > 1:
+            match_all = st.toggle(
+                "Match all selected labels",
+                value=st.session_state.filter_match_all[category_key],
+                key=f"filter_match_all_{category_key}"
             )
+            st.session_state.filter_match_all[category_key] = match_all
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Display tasks as custom styled list (already in priority order)
+    tasks = st.session_state.tasks[category_key]
+    
+    # Apply label filters, ignoring labels no task in this category has anymore
+    active_filters = st.session_state.active_filters[category_key] & set(category_labels_used)
+    if active_filters:
+        tasks = store.filter_tasks_by_labels(
+            category_key,
+            active_filters,
+            match_all=st.session_state.filter_match_all[category_key]
+        )
+    
+    # Only one page of tasks (and their widgets) is rendered per rerun
+    page_count = max(1, -(-len(tasks) // QUADRANT_PAGE_SIZE))
+    page = min(st.session_state.quadrant_pages[category_key], page_count - 1)
+    st.session_state.quadrant_pages[category_key] = page
+    page_start = page * QUADRANT_PAGE_SIZE
+    page_tasks = tasks[page_start:page_start + QUADRANT_PAGE_SIZE]
+    
+    # Bulk selection; tasks that left this quadrant drop out of it
+    selection = st.session_state.selected_tasks[category_key]
+    for task_id in [task_id for task_id in selection if store.task_position(category_key, task_id) is None]:
+        del selection[task_id]
+    bulk_mode = st.toggle("☑️ Select tasks", key=f"bulk_mode_{category_key}")
+    if bulk_mode:
+        render_bulk_actions(category_key, selection, page_tasks)
+    
+    if not tasks:
+        st.info("No tasks in this category")
+    else:
+        for task_idx, task in enumerate(page_tasks, start=page_start):
+            task_name = task["name"]
+            task_desc = task["description"]
+            task_id = task["id"]
+            task_due = task["due_date"]
+            task_labels = task["labels"]
             
-            # Add new task
-            with st.form(key=f"form_{category_key}", clear_on_submit=True):
-                new_task_name = st.text_input(
-                    "Task Name",
-                    key=f"input_name_{category_key}",
-                    placeholder="Enter task name..."
-                )
-                new_task_description = st.text_area(
-                    "Description (optional)",
-                    key=f"input_desc_{category_key}",
-                    placeholder="Enter task description...",
-                    height=80
-                )
-                new_task_due_date = st.date_input(
-                    "Due Date (optional)",
-                    key=f"input_due_{category_key}",
-                    value=None
-                )
-                new_task_labels = st.multiselect(
-                    "Labels (optional)",
-                    options=st.session_state.available_labels,
-                    key=f"input_labels_{category_key}"
-                )
-                
-                submit = st.form_submit_button("➕ Add Task", use_container_width=True)
-                
-                if submit:
-                    if add_task(category_key, new_task_name, new_task_description, new_task_due_date, new_task_labels):
-                        st.success("Task added!")
-                        st.rerun()
-                    else:
-                        st.warning("Please enter a task name")
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Label filter buttons
-            # Get all labels used in this category
-            category_labels_used = set()
-            for task in st.session_state.tasks[category_key]:
-                category_labels_used.update(task.get("labels", []))
+            # Check if overdue (buckets are computed once per day and data version)
+            due_bucket, days_left = due_status.get(task_id, ("none", None))
+            overdue = due_bucket == "overdue"
             
-            if category_labels_used:
-                st.markdown("**Filter by labels:**")
-                
-                # Create filter buttons
-                filter_cols = st.columns(min(len(category_labels_used) + 1, 6))
-                
-                # Clear filter button
-                with filter_cols[0]:
-                    if st.button("🔄 Clear", key=f"clear_filter_{category_key}", use_container_width=True):
-                        st.session_state.active_filters[category_key] = set()
-                        st.rerun()
-                
-                # Label filter buttons
-                for idx, label in enumerate(sorted(category_labels_used)):
-                    if idx + 1 < len(filter_cols):
-                        with filter_cols[idx + 1]:
-                            is_active = label in st.session_state.active_filters[category_key]
-                            button_style = "primary" if is_active else "secondary"
-                            label_color = get_label_color(label)
-                            
-                            if st.button(
-                                f"{'✓ ' if is_active else ''}{label}",
-                                key=f"filter_{category_key}_{label}",
-                                use_container_width=True,
-                                type=button_style
-                            ):
-                                if is_active:
-                                    st.session_state.active_filters[category_key].discard(label)
-                                else:
-                                    st.session_state.active_filters[category_key].add(label)
-                                st.rerun()
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Display tasks as custom styled list
-            tasks = st.session_state.tasks[category_key]
+            # Determine due date display and styling
+            due_date_html = ""
+            if task_due:
+                if overdue:
+                    due_date_html = f'<span style="color: #ff4b4b; font-weight: bold;">⚠️ OVERDUE: {task_due}</span>'
+                elif due_bucket == "soon":
+                    due_date_html = f'<span style="color: #ffa500; font-weight: bold;">⏰ Due: {task_due} ({days_left} days)</span>'
+                else:
+                    due_date_html = f'<span style="color: {secondary_text};">📅 Due: {task_due}</span>'
             
-            # Apply label filters
-            if st.session_state.active_filters[category_key]:
-                tasks = filter_tasks_by_labels(tasks, st.session_state.active_filters[category_key])
+            # Check if this task is being edited
+            is_editing = (st.session_state.editing_task == f"{category_key}_{task_id}")
             
-            # Sort tasks by priority
-            tasks.sort(key=lambda x: x.get("priority", 0))
+            # Set background color for overdue tasks
+            task_bg_color = "#ffebee" if overdue and not st.session_state.dark_mode else "#3d2020" if overdue else card_bg
             
-            if not tasks:
-                st.info("No tasks in this category")
-            else:
-                for task_idx, task in enumerate(tasks):
-                    # Handle backward compatibility with old 'text' field
-                    task_name = task.get("name", task.get("text", "Untitled"))
-                    task_desc = task.get("description", "")
-                    task_id = task["id"]
-                    task_due = task.get("due_date")
-                    task_labels = task.get("labels", [])
-                    
-                    # Check if overdue
-                    overdue = is_overdue(task_due)
-                    days_left = days_until_due(task_due)
-                    
-                    # Determine due date display and styling
-                    due_date_html = ""
-                    if task_due:
-                        if overdue:
-                            due_date_html = f'<span style="color: #ff4b4b; font-weight: bold;">⚠️ OVERDUE: {task_due}</span>'
-                        elif days_left is not None and days_left <= 3:
-                            due_date_html = f'<span style="color: #ffa500; font-weight: bold;">⏰ Due: {task_due} ({days_left} days)</span>'
-                        else:
-                            due_date_html = f'<span style="color: {secondary_text};">📅 Due: {task_due}</span>'
+            if is_editing:
+                # Edit mode - show form
+                st.markdown(
+                    f"""
+                    <div style="background-color: #fff3cd; padding: 12px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid {category_info['color']};">
+                        <div style="font-size: 0.9em; font-weight: 600; color: #856404; margin-bottom: 8px;">
+                            ✏️ Editing Task
+                        </div>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                
+                with st.form(key=f"edit_form_{task_id}"):
+                    edit_name = st.text_input("Task Name", value=task_name, key=f"edit_name_{task_id}")
+                    edit_desc = st.text_area("Description", value=task_desc, key=f"edit_desc_{task_id}", height=80)
                     
-                    # Check if this task is being edited
-                    is_editing = (st.session_state.editing_task == f"{category_key}_{task_id}")
+                    # Parse existing due date for date input
+                    from datetime import datetime as dt
+                    edit_due_default = dt.strptime(task_due, "%Y-%m-%d").date() if task_due else None
+                    edit_due = st.date_input("Due Date", value=edit_due_default, key=f"edit_due_{task_id}")
                     
-                    # Set background color for overdue tasks
-                    task_bg_color = "#ffebee" if overdue and not st.session_state.dark_mode else "#3d2020" if overdue else card_bg
+                    edit_labels = st.multiselect(
+                        "Labels",
+                        options=st.session_state.available_labels,
+                        default=task_labels,
+                        key=f"edit_labels_{task_id}"
+                    )
                     
-                    if is_editing:
-                        # Edit mode - show form
-                        st.markdown(
-                            f"""
-                            <div style="background-color: #fff3cd; padding: 12px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid {category_info['color']};">
-                                <div style="font-size: 0.9em; font-weight: 600; color: #856404; margin-bottom: 8px;">
-                                    ✏️ Editing Task
-                                </div>
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("💾 Save", use_container_width=True):
+                            if update_store(store.edit_task, category_key, task_id, edit_name, edit_desc, edit_due, edit_labels):
+                                st.session_state.editing_task = None
+                                st.success("Task updated!")
+                                st.rerun()
+                            else:
+                                st.warning("Please enter a task name")
+                    with col2:
+                        if st.form_submit_button("❌ Cancel", use_container_width=True):
+                            st.session_state.editing_task = None
+                            rerun_fragment()
+            else:
+                # Normal display mode
+                # Build the complete HTML with proper escaping
+                task_html = f"""
+                <div style="background-color: {task_bg_color}; padding: 12px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid {category_info['color']};">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <div style="flex-grow: 1;">
+                            <div style="font-size: 1.1em; font-weight: 600; color: {text_color}; margin-bottom: 5px;">
+                                {task_name}
                             </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
-                        
-                        with st.form(key=f"edit_form_{task_id}"):
-                            edit_name = st.text_input("Task Name", value=task_name, key=f"edit_name_{task_id}")
-                            edit_desc = st.text_area("Description", value=task_desc, key=f"edit_desc_{task_id}", height=80)
-                            
-                            # Parse existing due date for date input
-                            from datetime import datetime as dt
-                            edit_due_default = dt.strptime(task_due, "%Y-%m-%d").date() if task_due else None
-                            edit_due = st.date_input("Due Date", value=edit_due_default, key=f"edit_due_{task_id}")
-                            
-                            edit_labels = st.multiselect(
-                                "Labels",
-                                options=st.session_state.available_labels,
-                                default=task_labels,
-                                key=f"edit_labels_{task_id}"
-                            )
-                            
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                if st.form_submit_button("💾 Save", use_container_width=True):
-                                    if edit_task(category_key, task_id, edit_name, edit_desc, edit_due, edit_labels):
-                                        st.session_state.editing_task = None
-                                        st.success("Task updated!")
-                                        st.rerun()
-                            with col2:
-                                if st.form_submit_button("❌ Cancel", use_container_width=True):
-                                    st.session_state.editing_task = None
-                                    st.rerun()
-                    else:
-                        # Normal display mode
-                        # Build the complete HTML with proper escaping
-                        task_html = f"""
-                        <div style="background-color: {task_bg_color}; padding: 12px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid {category_info['color']};">
-                            <div style="display: flex; justify-content: space-between; align-items: center;">
-                                <div style="flex-grow: 1;">
-                                    <div style="font-size: 1.1em; font-weight: 600; color: {text_color}; margin-bottom: 5px;">
-                                        {task_name}
-                                    </div>
-                                    <div style="font-size: 0.85em; color: {secondary_text}; margin-bottom: 3px;">
-                                        {task_desc if task_desc else '<em>No description</em>'}
-                                    </div>
-                                    <div style="font-size: 0.75em; color: {secondary_text};">
-                                        Created: {task['created_at']}
-                                    </div>
-                                    <div style="font-size: 0.75em; margin-top: 3px;">
-                                        {due_date_html}
-                                    </div>
-                        """
-                        
-                        # Add labels if they exist
-                        if task_labels:
-                            task_html += '<div style="margin-top: 5px;">'
-                            for label in task_labels:
-                                label_color = get_label_color(label)
-                                task_html += f'<span style="background-color: {label_color}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 0.7em; margin-right: 4px; display: inline-block;">{label}</span>'
-                            task_html += '</div>'
-                        
-                        task_html += """
-                                </div>
+                            <div style="font-size: 0.85em; color: {secondary_text}; margin-bottom: 3px;">
+                                {task_desc if task_desc else '<em>No description</em>'}
                             </div>
+                            <div style="font-size: 0.75em; color: {secondary_text};">
+                                Created: {task['created_at']}
+                            </div>
+                            <div style="font-size: 0.75em; margin-top: 3px;">
+                                {due_date_html}
+                            </div>
+                """
+                
+                # Add labels if they exist
+                if task_labels:
+                    task_html += '<div style="margin-top: 5px;">'
+                    for label in task_labels:
+                        label_color = get_label_color(label)
+                        task_html += f'<span style="background-color: {label_color}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 0.7em; margin-right: 4px; display: inline-block;">{label}</span>'
+                    task_html += '</div>'
+                
+                task_html += """
                         </div>
-                        """
-                        
-                        st.markdown(task_html, unsafe_allow_html=True)
-                        
-                        # Priority ordering buttons
-                        col_up, col_down, col_edit, col_move, col_complete, col_delete = st.columns([0.7, 0.7, 1, 1, 1, 0.8])
-                        
-                        with col_up:
-                            if task_idx > 0:
-                                if st.button("⬆️", key=f"up_{task_id}", use_container_width=True, help="Move up"):
-                                    move_task_up(category_key, task_id)
-                                    st.rerun()
-                        
-                        with col_down:
-                            if task_idx < len(tasks) - 1:
-                                if st.button("⬇️", key=f"down_{task_id}", use_container_width=True, help="Move down"):
-                                    move_task_down(category_key, task_id)
-                                    st.rerun()
-                        
-                        with col_edit:
-                            if st.button("✏️ Edit", key=f"edit_{task_id}", use_container_width=True):
-                                st.session_state.editing_task = f"{category_key}_{task_id}"
-                                st.rerun()
-                        
-                        with col_move:
-                            if st.button("↔️ Move", key=f"move_{task_id}", use_container_width=True):
-                                st.session_state.editing_task = f"move_{category_key}_{task_id}"
-                                st.rerun()
-                        
-                        with col_complete:
-                            if st.button("✓ Done", key=f"complete_{task_id}", use_container_width=True):
-                                complete_task(category_key, task_id)
-                                st.rerun()
-                        
-                        with col_delete:
-                            if st.button("🗑️", key=f"delete_{task_id}", use_container_width=True):
-                                delete_task(category_key, task_id)
-                                st.rerun()
-                        
-                        # Move dialog
-                        if st.session_state.editing_task == f"move_{category_key}_{task_id}":
-                            st.markdown("**Move to:**")
-                            
-                            move_options = {k: v["title"] for k, v in categories.items() if k != category_key}
-                            
-                            cols = st.columns(len(move_options))
-                            for idx, (move_cat_key, move_cat_title) in enumerate(move_options.items()):
-                                with cols[idx]:
-                                    if st.button(move_cat_title, key=f"moveto_{move_cat_key}_{task_id}", use_container_width=True):
-                                        move_task(category_key, move_cat_key, task_id)
-                                        st.session_state.editing_task = None
-                                        st.success(f"Moved to {move_cat_title}")
-                                        st.rerun()
-                            
-                            if st.button("❌ Cancel Move", key=f"cancel_move_{task_id}", use_container_width=True):
+                    </div>
+                </div>
+                """
+                
+                if bulk_mode:
+                    selection_checkbox(selection, task_id)
+                st.markdown(task_html, unsafe_allow_html=True)
+                
+                # Priority ordering buttons
+                col_up, col_down, col_edit, col_move, col_complete, col_delete = st.columns([0.7, 0.7, 1, 1, 1, 0.8])
+                
+                with col_up:
+                    if task_idx > 0:
+                        if st.button("⬆️", key=f"up_{task_id}", use_container_width=True, help="Move up"):
+                            update_store(store.move_task_up, category_key, task_id)
+                            rerun_fragment()
+                
+                with col_down:
+                    if task_idx < len(tasks) - 1:
+                        if st.button("⬇️", key=f"down_{task_id}", use_container_width=True, help="Move down"):
+                            update_store(store.move_task_down, category_key, task_id)
+                            rerun_fragment()
+                
+                with col_edit:
+                    if st.button("✏️ Edit", key=f"edit_{task_id}", use_container_width=True):
+                        st.session_state.editing_task = f"{category_key}_{task_id}"
+                        rerun_fragment()
+                
+                with col_move:
+                    if st.button("↔️ Move", key=f"move_{task_id}", use_container_width=True):
+                        st.session_state.editing_task = f"move_{category_key}_{task_id}"
+                        rerun_fragment()
+                
+                with col_complete:
+                    if st.button("✓ Done", key=f"complete_{task_id}", use_container_width=True):
+                        update_store(store.complete_task, category_key, task_id)
+                        st.rerun()
+                
+                with col_delete:
+                    if st.button("🗑️", key=f"delete_{task_id}", use_container_width=True):
+                        update_store(store.delete_task, category_key, task_id)
+                        st.rerun()
+                
+                # Move dialog
+                if st.session_state.editing_task == f"move_{category_key}_{task_id}":
+                    st.markdown("**Move to:**")
+                    
+                    move_options = {k: v["title"] for k, v in categories.items() if k != category_key}
+                    
+                    cols = st.columns(len(move_options))
+                    for idx, (move_cat_key, move_cat_title) in enumerate(move_options.items()):
+                        with cols[idx]:
+                            if st.button(move_cat_title, key=f"moveto_{move_cat_key}_{task_id}", use_container_width=True):
+                                update_store(store.move_task, category_key, move_cat_key, task_id)
                                 st.session_state.editing_task = None
+                                st.success(f"Moved to {move_cat_title}")
                                 st.rerun()
-                        
-                        st.markdown("<br>", unsafe_allow_html=True)
 
+                    # Reorder within this quadrant
+                    category_size = len(st.session_state.tasks[category_key])
+                    pos_col, pos_button_col = st.columns([2, 1])
+                    with pos_col:
+                        new_position = st.number_input(
+                            "Position in this quadrant",
+                            min_value=1,
+                            max_value=category_size,
+                            value=(store.task_position(category_key, task_id) or 0) + 1,
+                            key=f"move_position_{task_id}"
+                        )
+                    with pos_button_col:
+                        if st.button("↕️ Reorder", key=f"move_to_position_{task_id}", use_container_width=True):
+                            update_store(store.move_task_to, category_key, task_id, int(new_position) - 1)
+                            st.session_state.editing_task = None
+                            rerun_fragment()
+
+                    if st.button("❌ Cancel Move", key=f"cancel_move_{task_id}", use_container_width=True):
+                        st.session_state.editing_task = None
+                        rerun_fragment()
+                
+                st.markdown("<br>", unsafe_allow_html=True)
+        
+        # Page navigation
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("◀ Prev", key=f"page_prev_{category_key}", use_container_width=True, disabled=page == 0):
+                    st.session_state.quadrant_pages[category_key] = page - 1
+                    rerun_fragment()
+            with page_col:
+                st.markdown(
+                    f'<div style="text-align: center; color: {secondary_text}; padding-top: 8px;">'
+                    f'Page {page + 1} of {page_count} ({len(tasks)} tasks)</div>',
+                    unsafe_allow_html=True
+                )
+            with next_col:
+                if st.button("Next ▶", key=f"page_next_{category_key}", use_container_width=True, disabled=page >= page_count - 1):
+                    st.session_state.quadrant_pages[category_key] = page + 1
+                    rerun_fragment()
+
+
+# Search across all quadrants and completed tasks
+@st.fragment
+@perf.profiled("search")
+def render_search():
+    query = st.text_input(
+        "🔍 Search tasks",
+        key="search_query",
+        placeholder="Search names, descriptions and labels..."
+    )
+    if not query.strip():
+        return
+    load_tasks()
+    results = store.search(query, limit=SEARCH_RESULT_LIMIT)
+    if not results:
+        st.info("No matching tasks.")
+        return
+    st.caption(f"Top {len(results)} matches" if len(results) == SEARCH_RESULT_LIMIT else f"{len(results)} matches")
+    for task, category, completed in results:
+        task_name = task["name"]
+        if completed:
+            status = f"✅ Completed {task['completed_at']}"
+        elif task["due_date"]:
+            status = f"📅 Due {task['due_date']}"
+        else:
+            status = "Active"
+        labels_html = "".join(
+            f'<span style="background-color: {get_label_color(label)}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 0.7em; margin-left: 4px;">{label}</span>'
+            for label in task["labels"]
+        )
+        st.markdown(
+            f'<div style="padding: 6px 10px; margin-bottom: 4px; border-left: 4px solid {categories[category]["color"]}; background-color: {card_bg}; border-radius: 4px;">'
+            f'<strong style="color: {header_text};">{task_name}</strong>{labels_html}'
+            f'<div style="font-size: 0.8em; color: {secondary_text};">{categories[category]["title"]} | {status}</div>'
+            f'</div>',
+            unsafe_allow_html=True
+        )
+
+render_search()
+
+# Create tabs. Streamlit runs the body of every tab on each rerun, so where
+# it can track the selected tab (on_change="rerun") only that one is built;
+# older versions fall back to building all of them.
+def create_tabs(labels):
+    try:
+        return st.tabs(labels, key="main_tab", on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+
+# Whether a tab's content is shown; always true when tabs are not tracked
+def tab_open(tab):
+    return getattr(tab, "open", None) is not False
+
+tab1, tab2, tab3 = create_tabs(["📋 Active Tasks", "✅ Completed Tasks", "📊 Statistics"])
+
+# Tab 1: Active Tasks (Eisenhower Matrix)
+with tab1:
+    if tab_open(tab1):
+        # Create two rows of two columns
+        row1_col1, row1_col2 = st.columns(2)
+        row2_col1, row2_col2 = st.columns(2)
+
+        columns = [row1_col1, row1_col2, row2_col1, row2_col2]
+        category_keys = list(categories.keys())
+
+        # Render each quadrant
+        for idx, (category_key, category_info) in enumerate(categories.items()):
+            with columns[idx]:
+                render_quadrant(category_key, category_info)
+
+        st.markdown("---")
     
-    st.markdown("---")
-    st.markdown("*Tasks are automatically saved and persist between sessions*")
+        # Bulk import: the whole file is validated first and saved in one write
+        with st.expander("📤 Import Tasks"):
+            uploaded_file = st.file_uploader(
+                "CSV, JSON or JSONL file",
+                type=IMPORT_FORMATS,
+                key="import_file",
+                help="Columns: name, description, category (quadrant), due date, labels, and optionally created / completed timestamps"
+            )
+            import_default_category = st.selectbox(
+                "Quadrant for rows without one",
+                [None] + list(categories),
+                format_func=lambda key: "Skip those rows" if key is None else categories[key]["title"],
+                key="import_default_category"
+            )
+            if uploaded_file is not None and st.button("📤 Import", key="import_button"):
+                import_format = uploaded_file.name.rsplit(".", 1)[-1].lower()
+                try:
+                    imported, import_errors = store.import_file(uploaded_file, import_format, import_default_category)
+                except Exception as e:
+                    st.error(f"Error importing tasks: {e}")
+                else:
+                    st.session_state.import_result = (imported, import_errors)
+                    st.rerun()
+        
+            if st.session_state.import_result:
+                imported, import_errors = st.session_state.import_result
+                st.success(f"Imported {imported} tasks")
+                if import_errors:
+                    st.warning(f"Skipped {len(import_errors)} invalid rows")
+                    st.markdown("\n".join(f"- Row {number}: {error}" for number, error in import_errors[:20]))
+    
+        st.markdown("*Tasks are automatically saved and persist between sessions*")
+
+# Completions per day for an activity range ending today
+def activity_series(range_name, today):
+    with store.lock:
+        day_counts = dict(store.data["stats"]["day"])
+    start = range_start(day_counts, today, ACTIVITY_RANGES[range_name])
+    return daily_series(day_counts, start, today), start
+
+# Rendered heatmap, cached per data version, day and range
+@st.cache_data(max_entries=16, show_spinner=False)
+def activity_heatmap(version, today, range_name):
+    series, start = activity_series(range_name, today)
+    return heatmap_html(series, start)
+
+# Weekly counts and their text bar chart, cached like activity_heatmap
+@st.cache_data(max_entries=16, show_spinner=False)
+def weekly_trend(version, today, range_name):
+    series, start = activity_series(range_name, today)
+    weeks = weekly_counts(series, start)
+    max_count = max((count for _, count in weeks), default=0)
+    lines = []
+    for week, count in weeks:
+        bar_length = int((count / max_count * 30)) if max_count > 0 else 0
+        bar = "█" * bar_length
+        lines.append(f"`{week}` {bar} {count}")
+    return weeks, "  \n".join(lines)
 
 # Tab 2: Completed Tasks
-with tab2:
+
+# Export file contents for one data version, built on request
+@st.cache_data(max_entries=4, show_spinner="Preparing export...")
+def build_export(version, export_format, include_active, include_labels):
+    return store.export(export_format, include_active, include_labels)
+
+# Completed history including the archive, read once per data version and
+# shared by the sessions that asked for it, so paging and searching do not
+# read the archive again. Dropped when no session used it for a while.
+@st.cache_resource(max_entries=2, ttl=600, show_spinner="Loading older history...")
+def full_history(version):
+    return store.completed_tasks()
+
+def reset_completed_page():
+    st.session_state.completed_page = 0
+
+@st.fragment
+@perf.profiled("completed_tab")
+def render_completed_tab():
+    load_tasks()
     st.header("✅ Completed Tasks")
     
-    if st.session_state.completed_tasks:
+    total_completed = store.completed_count()
+    if total_completed:
+        # Older tasks live in the archive and are only read when asked for
+        if st.session_state.show_archived_completed:
+            completed_tasks = full_history(data_version())
+        else:
+            completed_tasks = st.session_state.completed_tasks
+        
         # Summary statistics and actions
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Completed Tasks", len(st.session_state.completed_tasks))
+            st.metric("Total Completed Tasks", total_completed)
         with col2:
-            # Download button
-            completed_data_export = []
-            category_labels = {
-                "urgent_important": "Urgent & Important",
-                "not_urgent_important": "Not Urgent & Important",
-                "urgent_not_important": "Urgent & Not Important",
-                "not_urgent_not_important": "Not Urgent & Not Important"
-            }
-            
-            for task in st.session_state.completed_tasks:
-                task_name = task.get("name", task.get("text", "Untitled"))
-                task_desc = task.get("description", "")
+            # The file is only built after "Prepare export" and then reused
+            # until the data changes
+            with st.popover("📥 Export Tasks", use_container_width=True):
+                formats = [name for name in EXPORT_FORMATS if name != "Parquet" or parquet_available()]
+                export_format = st.selectbox("Format", formats, key="export_format")
+                include_active = st.checkbox("Include active tasks", key="export_include_active")
+                include_labels = st.checkbox("Include labels", key="export_include_labels")
+                export_key = (data_version(), export_format, include_active, include_labels)
                 
-                completed_data_export.append({
-                    "Task Name": task_name,
-                    "Description": task_desc,
-                    "Category": category_labels.get(task["category"], task["category"]),
-                    "Created": task["created_at"],
-                    "Completed": task["completed_at"]
-                })
-            
-            df_export = pd.DataFrame(completed_data_export)
-            csv = df_export.to_csv(index=False)
-            
-            st.download_button(
-                label="📥 Download Tasks (CSV)",
-                data=csv,
-                file_name=f"completed_tasks_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+                if st.session_state.export_ready != export_key:
+                    if st.button("📦 Prepare export", use_container_width=True):
+                        st.session_state.export_ready = export_key
+                if st.session_state.export_ready == export_key:
+                    extension, mime = EXPORT_FORMATS[export_format]
+                    scope = "tasks" if include_active else "completed_tasks"
+                    st.download_button(
+                        label=f"📥 Download ({export_format})",
+                        data=build_export(*export_key),
+                        file_name=f"{scope}_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                        mime=mime,
+                        use_container_width=True
+                    )
         with col3:
             if st.button("🗑️ Clear All Completed", use_container_width=True):
-                st.session_state.completed_tasks = []
-                save_tasks()
+                update_store(store.clear_completed)
+                st.session_state.show_archived_completed = False
                 st.rerun()
         
         st.markdown("---")
@@ -663,96 +974,18 @@ with tab2:
         # Activity Timeline (GitLab-style contribution graph)
         st.subheader("📊 Activity Timeline")
         
-        # Prepare data for timeline
-        from collections import defaultdict
-        from datetime import datetime as dt, timedelta
-        
-        # Count tasks completed per day
-        daily_counts = defaultdict(int)
-        for task in st.session_state.completed_tasks:
-            completed_date = task["completed_at"].split(" ")[0]  # Get just the date part
-            daily_counts[completed_date] += 1
-        
-        # Generate last 12 weeks of dates
-        today = dt.now()
-        weeks_ago = today - timedelta(days=84)  # 12 weeks
-        
-        # Create a list of all dates in range
-        date_range = []
-        current_date = weeks_ago
-        while current_date <= today:
-            date_range.append(current_date.strftime("%Y-%m-%d"))
-            current_date += timedelta(days=1)
-        
-        # Prepare data for heatmap
-        activity_data = []
-        for date_str in date_range:
-            count = daily_counts.get(date_str, 0)
-            date_obj = dt.strptime(date_str, "%Y-%m-%d")
-            activity_data.append({
-                "Date": date_str,
-                "Day": date_obj.strftime("%a"),
-                "Week": date_obj.strftime("%W"),
-                "Count": count
-            })
-        
-        df_activity = pd.DataFrame(activity_data)
-        
-        # Create pivot table for heatmap
-        pivot_data = df_activity.pivot_table(
-            index="Day",
-            columns="Week",
-            values="Count",
-            fill_value=0
+        activity_range = st.radio(
+            "Range",
+            list(ACTIVITY_RANGES),
+            horizontal=True,
+            key="activity_range",
+            label_visibility="collapsed"
         )
-        
-        # Reorder days of week
-        day_order = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        pivot_data = pivot_data.reindex(day_order)
-        
-        # Create custom HTML heatmap
-        max_count = df_activity["Count"].max()
-        
-        heatmap_html = '<div style="overflow-x: auto;"><table style="border-collapse: separate; border-spacing: 3px;">'
-        heatmap_html += '<tr><td style="width: 30px;"></td>'
-        
-        # Add week labels (only show some)
-        week_labels = pivot_data.columns.tolist()
-        for i, week in enumerate(week_labels):
-            if i % 2 == 0:  # Show every other week
-                heatmap_html += f'<td style="text-align: center; font-size: 0.7em; color: #666;">{week}</td>'
-            else:
-                heatmap_html += '<td></td>'
-        heatmap_html += '</tr>'
-        
-        # Add rows for each day
-        for day in day_order:
-            heatmap_html += f'<tr><td style="font-size: 0.8em; color: #666; text-align: right; padding-right: 5px;">{day}</td>'
-            
-            if day in pivot_data.index:
-                for week in pivot_data.columns:
-                    count = pivot_data.loc[day, week]
-                    
-                    # Determine color intensity
-                    if count == 0:
-                        color = "#ebedf0"
-                    elif count <= max_count * 0.25:
-                        color = "#9be9a8"
-                    elif count <= max_count * 0.5:
-                        color = "#40c463"
-                    elif count <= max_count * 0.75:
-                        color = "#30a14e"
-                    else:
-                        color = "#216e39"
-                    
-                    heatmap_html += f'<td style="width: 12px; height: 12px; background-color: {color}; border-radius: 2px;" title="{int(count)} tasks"></td>'
+        with perf.phase("heatmap"):
+            heatmap_html = activity_heatmap(data_version(), date.today(), activity_range)
             
-            heatmap_html += '</tr>'
-        
-        heatmap_html += '</table></div>'
-        
-        # Display heatmap
-        st.markdown(heatmap_html, unsafe_allow_html=True)
+            # Display heatmap
+            st.markdown(heatmap_html, unsafe_allow_html=True)
         
         # Legend
         st.markdown(
@@ -775,21 +1008,85 @@ with tab2:
         # Display completed tasks as styled cards
         st.subheader("All Completed Tasks")
         
-        for idx, task in enumerate(reversed(st.session_state.completed_tasks)):
-            task_name = task.get("name", task.get("text", "Untitled"))
-            task_desc = task.get("description", "")
-            task_labels = task.get("labels", [])
-            category_label = category_labels.get(task["category"], task["category"])
-            
-            # Get category color
-            category_colors = {
-                "Urgent & Important": "#ff4b4b",
-                "Not Urgent & Important": "#4b7bff",
-                "Urgent & Not Important": "#ffa500",
-                "Not Urgent & Not Important": "#808080"
-            }
+        # Filters and sort are applied before rendering; only one page of cards is built
+        search_col, range_col, sort_col = st.columns([2, 2, 1])
+        with search_col:
+            search_text = st.text_input(
+                "🔍 Search",
+                key="completed_search",
+                placeholder="Name, description or label",
+                on_change=reset_completed_page
+            )
+        with range_col:
+            date_range = st.date_input(
+                "Completed between",
+                value=(),
+                key="completed_date_range",
+                on_change=reset_completed_page
+            )
+        with sort_col:
+            sort_label = st.selectbox(
+                "Sort by",
+                list(COMPLETED_SORTS),
+                key="completed_sort",
+                on_change=reset_completed_page
+            )
+        
+        start_date, end_date = (list(date_range) + [None, None])[:2]
+        if start_date and not st.session_state.show_archived_completed:
+            # Reads only the archive months the range reaches into
+            list_source = store.completed_tasks(since=start_date.isoformat())
+        else:
+            list_source = completed_tasks
+        matches = query_completed(
+            list_source, search_text, start_date, end_date, COMPLETED_SORTS[sort_label]
+        )
+        
+        page_count = max(1, -(-len(matches) // COMPLETED_PAGE_SIZE))
+        page = min(st.session_state.completed_page, page_count - 1)
+        st.session_state.completed_page = page
+        page_start = page * COMPLETED_PAGE_SIZE
+        
+        page_tasks = matches[page_start:page_start + COMPLETED_PAGE_SIZE]
+        
+        # Bulk selection and delete
+        selection = st.session_state.selected_completed
+        bulk_mode = st.toggle("☑️ Select tasks", key="bulk_mode_completed")
+        if bulk_mode:
+            col_page, col_clear, col_delete = st.columns(3)
+            with col_page:
+                if st.button("Select page", key="bulk_select_page_completed", use_container_width=True):
+                    set_selection(selection, {task["id"]: archive_month(task) for task in page_tasks}, True)
+            with col_clear:
+                if st.button("Clear selection", key="bulk_clear_completed", use_container_width=True):
+                    set_selection(selection, dict(selection), False)
+            with col_delete:
+                if st.button(f"🗑️ Delete ({len(selection)})", key="bulk_delete_completed", use_container_width=True, disabled=not selection):
+                    update_store(store.delete_completed_tasks, dict(selection))
+                    selection.clear()
+                    st.rerun()
+        
+        if not matches:
+            st.info("No completed tasks match the current filters.")
+        
+        # Get category color
+        category_colors = {
+            "Urgent & Important": "#ff4b4b",
+            "Not Urgent & Important": "#4b7bff",
+            "Urgent & Not Important": "#ffa500",
+            "Not Urgent & Not Important": "#808080"
+        }
+        
+        for task in page_tasks:
+            task_name = task["name"]
+            task_desc = task["description"]
+            task_labels = task["labels"]
+            category_label = CATEGORY_LABELS.get(task["category"], task["category"])
             category_color = category_colors.get(category_label, "#808080")
             
+            if bulk_mode:
+                selection_checkbox(selection, task["id"], archive_month(task))
+            
             # Create styled card for completed task
             task_html = f"""
             <div style="background-color: #f0f2f6; padding: 12px; border-radius: 8px; margin-bottom: 10px; border-left: 4px solid {category_color};">
@@ -820,24 +1117,53 @@ with tab2:
             
             # Delete button
             if st.button("🗑️ Delete", key=f"delete_completed_{task['id']}", use_container_width=False):
-                delete_completed_task(task["id"])
+                update_store(store.delete_completed_task, task["id"], archive_month(task))
                 st.rerun()
             
             st.markdown("<br>", unsafe_allow_html=True)
+        
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("◀ Prev", key="completed_page_prev", use_container_width=True, disabled=page == 0):
+                    st.session_state.completed_page = page - 1
+                    rerun_fragment()
+            with page_col:
+                st.markdown(
+                    f'<div style="text-align: center; color: #666; padding-top: 8px;">'
+                    f'Page {page + 1} of {page_count} ({len(matches)} tasks)</div>',
+                    unsafe_allow_html=True
+                )
+            with next_col:
+                if st.button("Next ▶", key="completed_page_next", use_container_width=True, disabled=page >= page_count - 1):
+                    st.session_state.completed_page = page + 1
+                    rerun_fragment()
+        
+        archived_count = total_completed - len(st.session_state.completed_tasks)
+        if archived_count and not st.session_state.show_archived_completed:
+            if st.button(f"📂 Load older history ({archived_count} archived tasks)"):
+                st.session_state.show_archived_completed = True
+                st.rerun()
     else:
         st.info("No completed tasks yet. Complete tasks from the Active Tasks tab to see them here.")
 
+with tab2:
+    if tab_open(tab2):
+        render_completed_tab()
+
 # Tab 3: Statistics Dashboard
-with tab3:
+@st.fragment
+@perf.profiled("statistics")
+def render_statistics_tab():
+    load_tasks()
     st.header("📊 Statistics Dashboard")
     
     # Calculate statistics
-    from datetime import datetime as dt, timedelta
-    from collections import defaultdict
-    
-    # Count active tasks
-    total_active = sum(len(tasks) for tasks in st.session_state.tasks.values())
-    total_completed = len(st.session_state.completed_tasks)
+    # All-time figures come from aggregates maintained on every change,
+    # so archived tasks are counted without being read
+    stats = store.statistics()
+    total_active = stats["active_total"]
+    total_completed = stats["completed_total"]
     total_all_time = total_active + total_completed
     
     # Category labels
@@ -872,18 +1198,14 @@ with tab3:
     with col1:
         st.markdown("**Active Tasks by Category**")
         for cat_key, cat_label in category_labels.items():
-            count = len(st.session_state.tasks[cat_key])
+            count = stats["active"][cat_key]
             percentage = (count / total_active * 100) if total_active > 0 else 0
             st.markdown(f"**{cat_label}:** {count} ({percentage:.1f}%)")
     
     with col2:
         st.markdown("**Completed Tasks by Category**")
-        completed_by_cat = defaultdict(int)
-        for task in st.session_state.completed_tasks:
-            completed_by_cat[task["category"]] += 1
-        
         for cat_key, cat_label in category_labels.items():
-            count = completed_by_cat[cat_key]
+            count = stats["completed"][cat_key]
             percentage = (count / total_completed * 100) if total_completed > 0 else 0
             st.markdown(f"**{cat_label}:** {count} ({percentage:.1f}%)")
     
@@ -892,24 +1214,11 @@ with tab3:
     # Due Date Statistics
     st.subheader("📅 Due Date Analysis")
     
-    overdue_count = 0
-    due_soon_count = 0  # Due in next 3 days
-    due_later_count = 0
-    no_due_date_count = 0
-    
-    for category_tasks in st.session_state.tasks.values():
-        for task in category_tasks:
-            due_date = task.get("due_date")
-            if not due_date:
-                no_due_date_count += 1
-            elif is_overdue(due_date):
-                overdue_count += 1
-            else:
-                days_left = days_until_due(due_date)
-                if days_left is not None and days_left <= 3:
-                    due_soon_count += 1
-                else:
-                    due_later_count += 1
+    due_counts = stats["due"]
+    overdue_count = due_counts["overdue"]
+    due_soon_count = due_counts["soon"]  # Due in next 3 days
+    due_later_count = due_counts["later"]
+    no_due_date_count = due_counts["none"]
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -924,30 +1233,12 @@ with tab3:
     st.markdown("---")
     
     # Time to Complete Statistics
-    if st.session_state.completed_tasks:
+    if total_completed:
         st.subheader("⏱️ Time to Complete")
         
-        completion_times = []
-        for task in st.session_state.completed_tasks:
-            try:
-                created = dt.strptime(task["created_at"], "%Y-%m-%d %H:%M:%S")
-                completed = dt.strptime(task["completed_at"], "%Y-%m-%d %H:%M:%S")
-                days_to_complete = (completed - created).days
-                completion_times.append({
-                    "category": task["category"],
-                    "days": days_to_complete
-                })
-            except:
-                pass
+        avg_days = stats["average_days_to_complete"]
         
-        if completion_times:
-            # Overall average
-            avg_days = sum(t["days"] for t in completion_times) / len(completion_times)
-            
-            # By category
-            cat_times = defaultdict(list)
-            for ct in completion_times:
-                cat_times[ct["category"]].append(ct["days"])
+        if avg_days is not None:
             
             col1, col2 = st.columns(2)
             
@@ -957,8 +1248,8 @@ with tab3:
             with col2:
                 st.markdown("**By Category:**")
                 for cat_key, cat_label in category_labels.items():
-                    if cat_key in cat_times:
-                        cat_avg = sum(cat_times[cat_key]) / len(cat_times[cat_key])
+                    if cat_key in stats["days_to_complete"]:
+                        cat_avg = stats["days_to_complete"][cat_key]
                         st.markdown(f"**{cat_label}:** {cat_avg:.1f} days")
     
     st.markdown("---")
@@ -966,48 +1257,30 @@ with tab3:
     # Productivity Trends
     st.subheader("📈 Productivity Trends")
     
-    if st.session_state.completed_tasks:
-        # Tasks completed per week (last 12 weeks)
-        weekly_counts = defaultdict(int)
-        today = dt.now()
-        
-        for task in st.session_state.completed_tasks:
-            try:
-                completed_date = dt.strptime(task["completed_at"].split(" ")[0], "%Y-%m-%d")
-                week_num = completed_date.strftime("%Y-W%W")
-                weekly_counts[week_num] += 1
-            except:
-                pass
-        
-        # Get last 12 weeks
-        weeks = []
-        for i in range(11, -1, -1):
-            week_date = today - timedelta(weeks=i)
-            week_num = week_date.strftime("%Y-W%W")
-            weeks.append({
-                "Week": week_date.strftime("W%W"),
-                "Count": weekly_counts.get(week_num, 0)
-            })
+    if total_completed:
+        trend_range = st.radio(
+            "Range",
+            list(ACTIVITY_RANGES),
+            horizontal=True,
+            key="trend_range",
+            label_visibility="collapsed"
+        )
+        weeks, bars = weekly_trend(data_version(), date.today(), trend_range)
         
         # Create simple bar chart using text
-        st.markdown("**Tasks Completed per Week (Last 12 Weeks)**")
-        max_count = max(w["Count"] for w in weeks) if weeks else 1
-        
-        for week in weeks:
-            bar_length = int((week["Count"] / max_count * 30)) if max_count > 0 else 0
-            bar = "█" * bar_length
-            st.markdown(f"`{week['Week']}` {bar} {week['Count']}")
+        st.markdown(f"**Tasks Completed per Week ({trend_range})**")
+        st.markdown(bars)
         
         # Best and worst weeks
         if weeks:
-            best_week = max(weeks, key=lambda x: x["Count"])
-            worst_week = min(weeks, key=lambda x: x["Count"])
+            best_week = max(weeks, key=lambda x: x[1])
+            worst_week = min(weeks, key=lambda x: x[1])
             
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("🏆 Best Week", f"{best_week['Count']} tasks")
+                st.metric("🏆 Best Week", f"{best_week[1]} tasks")
             with col2:
-                st.metric("📉 Slowest Week", f"{worst_week['Count']} tasks")
+                st.metric("📉 Slowest Week", f"{worst_week[1]} tasks")
     else:
         st.info("Complete some tasks to see productivity trends!")
     
@@ -1020,7 +1293,7 @@ with tab3:
         st.markdown("**Distribution Across Categories:**")
         
         for cat_key, cat_label in category_labels.items():
-            count = len(st.session_state.tasks[cat_key])
+            count = stats["active"][cat_key]
             percentage = (count / total_active * 100) if total_active > 0 else 0
             bar_length = int(percentage / 2)  # Scale to 50 chars max
             bar = "▓" * bar_length
@@ -1030,9 +1303,9 @@ with tab3:
         st.markdown("---")
         st.subheader("💡 Recommendations")
         
-        urgent_important = len(st.session_state.tasks["urgent_important"])
-        not_urgent_important = len(st.session_state.tasks["not_urgent_important"])
-        urgent_not_important = len(st.session_state.tasks["urgent_not_important"])
+        urgent_important = stats["active"]["urgent_important"]
+        not_urgent_important = stats["active"]["not_urgent_important"]
+        urgent_not_important = stats["active"]["urgent_not_important"]
         
         if urgent_important > total_active * 0.4:
             st.warning("⚠️ You have many urgent & important tasks. Focus on completing these first!")
@@ -1046,4 +1319,36 @@ with tab3:
         if overdue_count > 0:
             st.error(f"🚨 You have {overdue_count} overdue task(s). Address these immediately!")
     else:
-        st.info("Add some tasks to see distribution analysis!")
\ No newline at end of file
+        st.info("Add some tasks to see distribution analysis!")
+
+with tab3:
+    if tab_open(tab3):
+        render_statistics_tab()
+
+# Sidebar panel with this run's phases and the session's recent runs
+def render_profile_panel(profile):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        summary = f"**This run:** {profile.seconds * 1000:.0f} ms"
+        if profile.counted:
+            summary += (f" · {profile.elements} elements · {profile.widgets} widgets"
+                        f" · {profile.html_bytes / 1024:.1f} KB HTML")
+        st.markdown(summary)
+        rows = ["| Phase | ms | Widgets | HTML KB |", "|---|---:|---:|---:|"]
+        for record in profile.phases:
+            name = "&nbsp;" * 4 * record["depth"] + record["name"]
+            rows.append(
+                f"| {name} | {record['seconds'] * 1000:.1f} | {record.get('widgets', '')} "
+                f"| {record.get('html_bytes', 0) / 1024:.1f} |"
+            )
+        st.markdown("\n".join(rows))
+        recent = [
+            f"{run.kind} {run.seconds * 1000:.0f} ms" + ("" if run.status == "complete" else f" ({run.status})")
+            for run in perf.recent_profiles() if run.finished
+        ]
+        st.caption("Recent runs: " + ", ".join(recent))
+        if PROFILE_LOG_FILE:
+            st.caption(f"Logged to `{PROFILE_LOG_FILE}`")
+
+profile = perf.finish_run()
+if profile is not None:
+    render_profile_panel(profile)
@@ -0,0 +1,131 @@
+# Synthetic tasks_data.json files for benchmarking:
+#
+#     python benchmarks/generate_data.py --active 2000 --completed 50000 -o tasks_data.json
+#
+# The files use the plain JSON layout written by older versions of the app
+# (no stored aggregates or archive), so loading one does the same first-load
+# work as an upgrade. A share of the records can use the legacy layout, with
+# a "text" field instead of "name" and no description or labels.
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+CATEGORIES = [
+    "urgent_important",
+    "not_urgent_important",
+    "urgent_not_important",
+    "not_urgent_not_important"
+]
+
+# Relative quadrant sizes: most tasks are scheduled, few are left to eliminate
+CATEGORY_WEIGHTS = [3, 4, 2, 1]
+
+WORDS = (
+    "review plan call email draft report budget meeting client invoice update fix "
+    "deploy write read prepare schedule book order check clean pay renew submit "
+    "design test release backup migrate refactor document present interview train"
+).split()
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _phrase(rng, low, high):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _task(rng, number, created, label_names, labels_per_task, due_spread_days, today, legacy):
+    task = {"id": f"{created:%Y%m%d%H%M%S}-{number:08d}"}
+    if legacy:
+        task["text"] = _phrase(rng, 2, 5)
+    else:
+        task["name"] = _phrase(rng, 2, 5)
+        task["description"] = _phrase(rng, 0, 12)
+        task["labels"] = rng.sample(label_names, rng.randint(0, min(labels_per_task, len(label_names))))
+        if due_spread_days and rng.random() < 0.6:
+            # Due dates from due_spread_days ago to due_spread_days ahead
+            due = today + timedelta(days=rng.randint(-due_spread_days, due_spread_days))
+            task["due_date"] = due.strftime("%Y-%m-%d")
+        else:
+            task["due_date"] = None
+    task["created_at"] = created.strftime(TIMESTAMP_FORMAT)
+    return task
+
+
+# Data set as a dict in the tasks_data.json layout. Completed tasks are
+# spread evenly over the last history_days days.
+def generate_data(active=1000, completed=10000, labels=20, labels_per_task=3, due_spread_days=30,
+                  history_days=730, legacy_fraction=0.05, seed=0, now=None):
+    rng = random.Random(seed)
+    now = now or datetime.now().replace(microsecond=0)
+    today = now.date()
+    label_names = [f"label-{i:03d}" for i in range(labels)]
+    tasks = {category: [] for category in CATEGORIES}
+
+    for number in range(active):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        task = _task(rng, number, created, label_names, labels_per_task, due_spread_days, today,
+                     rng.random() < legacy_fraction)
+        category = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+        task["priority"] = len(tasks[category])
+        tasks[category].append(task)
+
+    completed_tasks = []
+    for number in range(completed):
+        completed_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * history_days))
+        created = completed_at - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        task = _task(rng, active + number, created, label_names, labels_per_task, due_spread_days, today,
+                     rng.random() < legacy_fraction)
+        task["priority"] = 0
+        task["completed_at"] = completed_at.strftime(TIMESTAMP_FORMAT)
+        task["category"] = rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0]
+        completed_tasks.append(task)
+    completed_tasks.sort(key=lambda task: task["completed_at"])
+
+    return {
+        "tasks": tasks,
+        "completed_tasks": completed_tasks,
+        "label_colors": {}
+    }
+
+
+def write_data(path, **options):
+    with open(path, "w") as f:
+        json.dump(generate_data(**options), f)
+
+
+def add_arguments(parser):
+    parser.add_argument("--labels", type=int, default=20, help="number of distinct labels")
+    parser.add_argument("--labels-per-task", type=int, default=3, help="most labels on one task")
+    parser.add_argument("--due-spread", type=int, default=30,
+                        help="due dates fall up to this many days before or after today (0: no due dates)")
+    parser.add_argument("--history-days", type=int, default=730, help="completed tasks span this many days")
+    parser.add_argument("--legacy", type=float, default=0.05,
+                        help="fraction of records in the legacy layout (text field, no labels)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def data_options(args):
+    return {
+        "labels": args.labels,
+        "labels_per_task": args.labels_per_task,
+        "due_spread_days": args.due_spread,
+        "history_days": args.history_days,
+        "legacy_fraction": args.legacy,
+        "seed": args.seed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic tasks_data.json file.")
+    parser.add_argument("--active", type=int, default=1000, help="number of active tasks")
+    parser.add_argument("--completed", type=int, default=10000, help="number of completed tasks")
+    parser.add_argument("-o", "--output", default="tasks_data.json")
+    add_arguments(parser)
+    args = parser.parse_args()
+    write_data(args.output, active=args.active, completed=args.completed, **data_options(args))
+    print(f"Wrote {args.active} active and {args.completed} completed tasks to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# Benchmarks for the app's hot paths at several data sizes:
+#
+#     python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 -o report.json
+#     python benchmarks/run_benchmarks.py --sizes 1000 --baseline report.json
+#
+# For each size a synthetic data file is generated (see generate_data.py)
+# and every benchmark is timed --repeat times. Headless benchmarks call the
+# TaskStore and the activity functions directly; the app_* benchmarks run the
+# whole script through Streamlit's AppTest. The report is a JSON document
+# with the environment, the options and the timings in seconds per size.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from generate_data import add_arguments, data_options, write_data  # noqa: E402
+
+from activity import daily_series, heatmap_html, range_start, weekly_counts  # noqa: E402
+from storage import CATEGORIES, compute_due_buckets, query_completed  # noqa: E402
+from task_store import STORAGE_BACKENDS, TaskStore, open_storage  # noqa: E402
+
+REPORT_SCHEMA = 1
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Share of each size that is active tasks; the rest is completed history
+ACTIVE_SHARE = 0.1
+SEARCH_QUERIES = ["review", "client report", "migr"]
+# Tab labels as created in app.py; AppTest does not send the selected tab
+# back, so it is set in session state before every run
+APP_TABS = {
+    "active": "📋 Active Tasks",
+    "completed": "✅ Completed Tasks",
+    "statistics": "📊 Statistics"
+}
+APP_TIMEOUT = 600
+
+
+def timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def summary(runs):
+    return {
+        "runs": [round(run, 6) for run in runs],
+        "min": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+        "mean": round(statistics.fmean(runs), 6)
+    }
+
+
+class Workspace:
+    """Data files for one benchmark size, in a temporary directory."""
+
+    def __init__(self, directory, backend):
+        self.directory = Path(directory)
+        self.backend = backend
+        self.data_file = self.directory / "tasks_data.json"
+
+    def open_store(self):
+        storage = open_storage(self.backend, self.data_file, self.directory / "tasks_journal.jsonl",
+                               self.directory / "tasks_data.db")
+        return TaskStore(storage)
+
+
+# Headless hot paths by name. Benchmarks that change the data run after the
+# read-only ones.
+def store_benchmarks(workspace, store):
+    label_sets = []
+    for category in CATEGORIES:
+        labels = store.category_labels(category)[:2]
+        label_sets += [(category, labels[:1], False), (category, labels, False), (category, labels, True)]
+
+    def filter_tasks_by_labels():
+        for category, labels, match_all in label_sets:
+            store.filter_tasks_by_labels(category, labels, match_all)
+
+    # Computed directly: the store caches the buckets for the day
+    def due_buckets():
+        compute_due_buckets(store.index, date.today().toordinal())
+
+    def heatmap():
+        day_counts = store.data["stats"]["day"]
+        today = date.today()
+        for days in (84, 365, None):
+            start = range_start(day_counts, today, days)
+            heatmap_html(daily_series(day_counts, start, today), start)
+
+    def weekly_trend():
+        day_counts = store.data["stats"]["day"]
+        today = date.today()
+        start = range_start(day_counts, today, None)
+        weekly_counts(daily_series(day_counts, start, today), start)
+
+    def search():
+        for query in SEARCH_QUERIES:
+            store.search(query)
+
+    def completed_query():
+        query_completed(store.completed_tasks(), "review", sort="newest")
+
+    def add_and_complete_task():
+        task_id = store.add_task("urgent_important", "benchmark task", labels=["benchmark"])
+        store.complete_task("urgent_important", task_id)
+
+    return {
+        "load_tasks": workspace.open_store,
+        "refresh_unchanged": store.refresh,
+        "filter_tasks_by_labels": filter_tasks_by_labels,
+        "due_buckets": due_buckets,
+        "statistics": store.statistics,
+        "heatmap": heatmap,
+        "weekly_trend": weekly_trend,
+        "search": search,
+        "completed_query": completed_query,
+        "save_tasks": store.save,
+        "add_and_complete_task": add_and_complete_task
+    }
+
+
+# Full script runs through AppTest: a first render on a fresh process-wide
+# store, then reruns on each tab
+def app_benchmarks(workspace, repeat):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["EISENHOWER_STORAGE"] = workspace.backend
+    app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=APP_TIMEOUT)
+
+    def run(tab):
+        app.session_state["main_tab"] = APP_TABS[tab]
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"app raised: {app.exception[0].value}")
+
+    def first_render():
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        run("active")
+
+    results = {"app_first_render": summary(timed(first_render, 1))}
+    for tab in APP_TABS:
+        results[f"app_rerun_{tab}"] = summary(timed(lambda: run(tab), repeat))
+    return results
+
+
+def run_size(size, args):
+    active = int(size * ACTIVE_SHARE)
+    completed = size - active
+    with tempfile.TemporaryDirectory(prefix="eisenhower-bench-") as directory:
+        workspace = Workspace(directory, args.backend)
+        start = time.perf_counter()
+        write_data(workspace.data_file, active=active, completed=completed, **data_options(args))
+        result = {
+            "size": size,
+            "active": active,
+            "completed": completed,
+            "file_bytes": workspace.data_file.stat().st_size,
+            "generate_seconds": round(time.perf_counter() - start, 6),
+            "benchmarks": {}
+        }
+        # The first load upgrades the file: aggregates are built and old
+        # completed tasks are moved to the archive (or imported into SQLite)
+        stores = []
+        result["benchmarks"]["load_first"] = summary(timed(lambda: stores.append(workspace.open_store()), 1))
+        store = stores[0]
+        for name, fn in store_benchmarks(workspace, store).items():
+            result["benchmarks"][name] = summary(timed(fn, args.repeat))
+        if not args.no_app:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                result["benchmarks"].update(app_benchmarks(workspace, args.repeat))
+            finally:
+                os.chdir(cwd)
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        from importlib.metadata import version
+        streamlit_version = version("streamlit")
+    except Exception:
+        streamlit_version = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "streamlit": streamlit_version
+    }
+
+
+# Median timings as a table, with the ratio to a baseline report if given
+def print_table(report, baseline=None):
+    previous = {}
+    if baseline:
+        for result in baseline["results"]:
+            for name, timing in result["benchmarks"].items():
+                previous[(result["size"], name)] = timing["median"]
+    for result in report["results"]:
+        print(f"\n{result['size']} tasks ({result['active']} active, {result['completed']} completed, "
+              f"{result['file_bytes'] / 1e6:.1f} MB)")
+        for name, timing in result["benchmarks"].items():
+            line = f"  {name:24} {timing['median'] * 1000:10.2f} ms"
+            before = previous.get((result["size"], name))
+            if before:
+                line += f"  {timing['median'] / before:6.2f}x baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the task manager's hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="total tasks per data set, active and completed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--backend", choices=STORAGE_BACKENDS, default="json")
+    parser.add_argument("--no-app", action="store_true", help="skip the AppTest full-script runs")
+    parser.add_argument("-o", "--output", default="benchmark_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare medians with")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    report = {
+        "schema": REPORT_SCHEMA,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "options": {"backend": args.backend, "repeat": args.repeat, "active_share": ACTIVE_SHARE,
+                    **data_options(args)},
+        "results": []
+    }
+    for size in args.sizes:
+        print(f"Running {size} tasks...", file=sys.stderr)
+        report["results"].append(run_size(size, args))
+        # Written after every size so a long run leaves partial results
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
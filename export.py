@@ -0,0 +1,111 @@
+import csv
+import importlib.util
+import io
+import json
+
+# Rows are converted and written this many at a time
+EXPORT_CHUNK_ROWS = 5000
+
+CATEGORY_LABELS = {
+    "urgent_important": "Urgent & Important",
+    "not_urgent_important": "Not Urgent & Important",
+    "urgent_not_important": "Urgent & Not Important",
+    "not_urgent_not_important": "Not Urgent & Not Important"
+}
+
+# Format name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSONL": ("jsonl", "application/jsonl"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet")
+}
+
+
+# Parquet output needs pyarrow, which is not a hard dependency
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def export_columns(include_active=False, include_labels=False):
+    columns = ["Task Name", "Description", "Category", "Created", "Completed"]
+    if include_active:
+        columns += ["Status", "Due Date"]
+    if include_labels:
+        columns.append("Labels")
+    return columns
+
+
+# One export row per task: completed tasks first, then active tasks by quadrant
+def export_rows(completed_tasks, active_tasks=None, include_labels=False):
+    sources = [(task, task["category"]) for task in completed_tasks]
+    if active_tasks is not None:
+        sources += [(task, category) for category, task_list in active_tasks.items() for task in task_list]
+    for task, category in sources:
+        row = {
+            "Task Name": task["name"],
+            "Description": task["description"],
+            "Category": CATEGORY_LABELS.get(category, category),
+            "Created": task.get("created_at"),
+            "Completed": task.get("completed_at")
+        }
+        if active_tasks is not None:
+            row["Status"] = "Completed" if task.get("completed_at") else "Active"
+            row["Due Date"] = task.get("due_date")
+        if include_labels:
+            row["Labels"] = list(task.labels)
+        yield row
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_csv(rows, columns, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, fieldnames=columns)
+    writer.writeheader()
+    for chunk in _chunks(rows, EXPORT_CHUNK_ROWS):
+        for row in chunk:
+            if "Labels" in row:
+                row["Labels"] = "; ".join(row["Labels"])
+        writer.writerows(chunk)
+    text.flush()
+    text.detach()
+
+
+def _write_jsonl(rows, columns, out):
+    for chunk in _chunks(rows, EXPORT_CHUNK_ROWS):
+        out.write("".join(json.dumps(row) + "\n" for row in chunk).encode("utf-8"))
+
+
+# One Parquet row group per chunk
+def _write_parquet(rows, columns, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [pa.field(column, pa.string()) for column in columns if column != "Labels"]
+    if "Labels" in columns:
+        fields.append(pa.field("Labels", pa.list_(pa.string())))
+    schema = pa.schema(fields)
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in _chunks(rows, EXPORT_CHUNK_ROWS):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+
+_WRITERS = {"CSV": _write_csv, "JSONL": _write_jsonl, "Parquet": _write_parquet}
+
+
+# Export file contents as bytes
+def export_tasks(export_format, completed_tasks, active_tasks=None, include_labels=False):
+    columns = export_columns(active_tasks is not None, include_labels)
+    rows = export_rows(completed_tasks, active_tasks, include_labels)
+    out = io.BytesIO()
+    _WRITERS[export_format](rows, columns, out)
+    return out.getvalue()
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from export import CATEGORY_LABELS
+from storage import CATEGORIES, new_task_id, next_order_key
+
+# Accepted column names (lower-cased) for each task field. The export's
+# column names are included so exported files can be imported again.
+IMPORT_FIELDS = {
+    "name": ["name", "task name", "task", "title", "text"],
+    "description": ["description", "notes", "details"],
+    "category": ["category", "quadrant"],
+    "due_date": ["due_date", "due date", "due"],
+    "labels": ["labels", "tags"],
+    "created_at": ["created_at", "created"],
+    "completed_at": ["completed_at", "completed"]
+}
+
+IMPORT_FORMATS = ["csv", "json", "jsonl"]
+
+# Category keys by key and by display name, lower-cased
+_CATEGORY_NAMES = {category: category for category in CATEGORIES}
+_CATEGORY_NAMES.update({label.lower(): category for category, label in CATEGORY_LABELS.items()})
+
+
+class RecordError(ValueError):
+    pass
+
+
+# Raw records from a file object, one at a time. JSON files may hold a list
+# of records or a tasks_data.json document.
+def read_records(fileobj, import_format):
+    if import_format == "csv":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="") if isinstance(fileobj.read(0), bytes) else fileobj
+        yield from csv.DictReader(text)
+    elif import_format == "jsonl":
+        for line in fileobj:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    elif import_format == "json":
+        document = json.load(fileobj)
+        if isinstance(document, dict):
+            for category, task_list in document.get("tasks", {}).items():
+                for task in task_list:
+                    yield dict(task, category=category)
+            yield from document.get("completed_tasks", [])
+        else:
+            yield from document
+    else:
+        raise ValueError(f"Unknown import format: {import_format}")
+
+
+def _field(record, field):
+    for name in IMPORT_FIELDS[field]:
+        if name in record and record[name] not in (None, ""):
+            return record[name]
+    return None
+
+
+def _timestamp(value, field):
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value).strftime("%Y-%m-%d 00:00:00")
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise RecordError(f"invalid {field} {value!r}")
+
+
+# Task (with its category and completion time) for one record
+def map_record(record, default_category=None, now=None):
+    record = {str(key).strip().lower(): value for key, value in record.items()}
+    name = _field(record, "name")
+    if name is None or not str(name).strip():
+        raise RecordError("missing task name")
+
+    category = _field(record, "category")
+    if category is None:
+        category = default_category
+    else:
+        category = _CATEGORY_NAMES.get(str(category).strip().lower())
+    if category is None:
+        raise RecordError(f"unknown quadrant {_field(record, 'category')!r}")
+
+    due_date = _field(record, "due_date")
+    if due_date is not None:
+        due_date = str(due_date).strip()[:10]
+        try:
+            date.fromisoformat(due_date)
+        except ValueError:
+            raise RecordError(f"invalid due date {due_date!r}")
+
+    labels = _field(record, "labels") or []
+    if isinstance(labels, str):
+        separator = ";" if ";" in labels else ","
+        labels = [label.strip() for label in labels.split(separator)]
+    labels = list(dict.fromkeys(str(label) for label in labels if label))
+
+    task = {
+        "id": new_task_id(),
+        "name": str(name).strip(),
+        "description": str(_field(record, "description") or "").strip(),
+        "created_at": _timestamp(_field(record, "created_at"), "created date") or now,
+        "due_date": due_date,
+        "priority": 0,
+        "labels": labels
+    }
+    return task, category, _timestamp(_field(record, "completed_at"), "completion date")
+
+
+# Valid records mapped to tasks, in file order, and the invalid ones.
+# Returns ([(category, task, completed_at)], [(record number, error)]).
+def plan_import(records, default_category=None):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = []
+    errors = []
+    for number, record in enumerate(records, start=1):
+        try:
+            if not isinstance(record, dict):
+                raise RecordError("not an object")
+            task, category, completed_at = map_record(record, default_category, now)
+        except RecordError as e:
+            errors.append((number, str(e)))
+            continue
+        rows.append((category, task, completed_at))
+    return rows, errors
+
+
+# Operations adding rows at the end of their quadrants; completed rows are
+# completed right away so statistics and the archive treat them as usual
+def import_operations(data, rows):
+    order_keys = {category: next_order_key(data["tasks"][category]) for category in CATEGORIES}
+    ops = []
+    for category, task, completed_at in rows:
+        task["priority"] = order_keys[category]
+        order_keys[category] += 1
+        ops.append({"op": "add_task", "category": category, "task": task})
+        if completed_at is not None:
+            ops.append({"op": "complete_task", "category": category, "task_id": task["id"],
+                        "completed_at": completed_at})
+    return ops
+
+
+# Import tasks from a file object into a SharedStore with a single commit.
+# Nothing is imported if the file cannot be parsed. Returns (number of
+# tasks imported, [(record number, error)]) for the skipped records.
+def import_tasks(store, fileobj, import_format, default_category=None):
+    try:
+        rows, errors = plan_import(read_records(fileobj, import_format), default_category)
+    except (csv.Error, json.JSONDecodeError, UnicodeDecodeError, TypeError) as e:
+        raise ValueError(f"Could not read {import_format.upper()} file: {e}")
+    with store.lock:
+        store.commit(import_operations(store.data, rows))
+    return len(rows), errors
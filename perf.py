@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+import streamlit as st
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+# Session state keys for the profile being recorded and the recent ones
+PROFILE_KEY = "_run_profile"
+HISTORY_KEY = "_run_profile_history"
+HISTORY_SIZE = 10
+
+_NO_PHASE = nullcontext()
+_log_lock = threading.Lock()
+
+
+class RunProfile:
+    """Phase timings and output counts for one script or fragment run.
+
+    While the profile is recording, every element the session sends to the
+    browser is counted by wrapping the run context's message queue, so the
+    app code does not have to report what it renders. Widgets are elements
+    with an id; HTML bytes are the bodies of st.html and of markdown with
+    unsafe_allow_html.
+    """
+
+    def __init__(self, kind, log_path=None):
+        self.kind = kind
+        self.log_path = log_path
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.status = None
+        self.phases = []
+        self.elements = 0
+        self.widgets = 0
+        self.html_bytes = 0
+        self.session_id = None
+        self.counted = False
+        self._depth = 0
+        self._ctx = get_script_run_ctx() if get_script_run_ctx else None
+        self._watch()
+
+    @property
+    def finished(self):
+        return self.status is not None
+
+    def _watch(self):
+        enqueue = getattr(self._ctx, "_enqueue", None)
+        if enqueue is None:
+            return
+        self.session_id = self._ctx.session_id
+        # A run stopped by st.rerun() leaves its counter in place
+        enqueue = getattr(enqueue, "profile_inner", enqueue)
+
+        def counting_enqueue(msg):
+            self._count(msg)
+            enqueue(msg)
+
+        counting_enqueue.profile_inner = enqueue
+        self._ctx._enqueue = counting_enqueue
+        self.counted = True
+
+    def _unwatch(self):
+        if self.counted:
+            self._ctx._enqueue = getattr(self._ctx._enqueue, "profile_inner", self._ctx._enqueue)
+
+    def _count(self, msg):
+        if msg.WhichOneof("type") != "delta" or msg.delta.WhichOneof("type") != "new_element":
+            return
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        if kind is None:
+            return
+        self.elements += 1
+        body = getattr(element, kind)
+        if kind == "html" or (kind == "markdown" and body.allow_html):
+            self.html_bytes += len(body.body.encode("utf-8"))
+        elif getattr(body, "id", None):
+            self.widgets += 1
+
+    # Time a phase; phases may nest and are listed in the order they start
+    @contextmanager
+    def phase(self, name):
+        record = {"name": name, "depth": self._depth}
+        self.phases.append(record)
+        counts = (self.elements, self.widgets, self.html_bytes)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            self._depth -= 1
+            if self.counted:
+                record["elements"] = self.elements - counts[0]
+                record["widgets"] = self.widgets - counts[1]
+                record["html_bytes"] = self.html_bytes - counts[2]
+
+    # Stop counting and append the profile to the log file
+    def finish(self, status="complete"):
+        if self.finished:
+            return
+        self.seconds = round(time.perf_counter() - self.started, 6)
+        self.status = status
+        self._unwatch()
+        if self.log_path:
+            line = json.dumps(self.to_dict()) + "\n"
+            with _log_lock:
+                with open(self.log_path, "a") as f:
+                    f.write(line)
+
+    def to_dict(self):
+        result = {
+            "time": self.started_at.isoformat(timespec="milliseconds"),
+            "session": self.session_id,
+            "kind": self.kind,
+            "status": self.status,
+            "seconds": self.seconds,
+            "phases": self.phases
+        }
+        if self.counted:
+            result.update(elements=self.elements, widgets=self.widgets, html_bytes=self.html_bytes)
+        return result
+
+
+def _history():
+    if HISTORY_KEY not in st.session_state:
+        st.session_state[HISTORY_KEY] = deque(maxlen=HISTORY_SIZE)
+    return st.session_state[HISTORY_KEY]
+
+
+# Start profiling this script run, or turn profiling off for the session.
+# Returns the new profile, or None when disabled.
+def start_run(enabled, log_path=None):
+    previous = st.session_state.get(PROFILE_KEY)
+    if previous is not None and not previous.finished:
+        previous.finish("interrupted")
+    if not enabled:
+        if previous is not None:
+            del st.session_state[PROFILE_KEY]
+        return None
+    profile = RunProfile("run", log_path)
+    st.session_state[PROFILE_KEY] = profile
+    _history().append(profile)
+    return profile
+
+
+# Finish the current run's profile; returns it, or None when disabled
+def finish_run():
+    profile = st.session_state.get(PROFILE_KEY)
+    if profile is not None:
+        profile.finish()
+    return profile
+
+
+# Context manager timing a phase of the current run. It does nothing when
+# profiling is off. A phase that starts after the script run has finished
+# belongs to a fragment rerun and is recorded (and logged) on its own.
+def phase(name):
+    profile = st.session_state.get(PROFILE_KEY)
+    if profile is None:
+        return _NO_PHASE
+    if not profile.finished:
+        return profile.phase(name)
+    return _fragment_phase(name, profile.log_path)
+
+
+@contextmanager
+def _fragment_phase(name, log_path):
+    profile = RunProfile("fragment", log_path)
+    # Phases nested in the fragment are recorded in its profile
+    st.session_state[PROFILE_KEY] = profile
+    _history().append(profile)
+    try:
+        with profile.phase(name):
+            yield
+    finally:
+        profile.finish()
+
+
+# Decorator timing every call of a render function as a phase. name is
+# formatted with the call's positional arguments, e.g. "quadrant {0}".
+def profiled(name):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name.format(*args)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Profiles of the session's recent runs, oldest first
+def recent_profiles():
+    return list(st.session_state.get(HISTORY_KEY, ()))
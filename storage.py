@@ -0,0 +1,1805 @@
+import gzip
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import uuid
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # Optional; the json module is used instead
+    orjson = None
+
+CATEGORIES = [
+    "urgent_important",
+    "not_urgent_important",
+    "urgent_not_important",
+    "not_urgent_not_important"
+]
+
+# Compact the journal into a new snapshot after this many appended operations
+JOURNAL_COMPACT_EVERY = 500
+
+# Completed tasks older than this many days move to monthly archive segments
+ARCHIVE_AFTER_DAYS = 120
+
+# Archive months kept in memory after being read, least recently used dropped first
+ARCHIVE_CACHE_MONTHS = 12
+
+# Layout of stored documents. Documents without a "schema" key are version 1:
+# indented JSON whose records may use "text" for the name and lack labels or
+# a description. Version 2 records are normalized and the files are
+# minified, with gzip-compressed archive segments.
+SCHEMA_VERSION = 2
+
+
+# Empty data set in the tasks_data.json layout
+def empty_data():
+    return {
+        "tasks": {category: [] for category in CATEGORIES},
+        "completed_tasks": [],
+        "label_colors": {},
+        # Archived completed tasks per "YYYY-MM" month, not held in memory
+        "archive": {},
+        "stats": empty_stats()
+    }
+
+
+# Aggregates over all completed tasks, archived ones included. "category"
+# and "day" ("YYYY-MM-DD") map to task counts; "days_to_complete" maps
+# category -> [total days, number of tasks]. Weekly counts are derived from
+# the days (see activity.weekly_counts).
+def empty_stats():
+    return {"category": {}, "day": {}, "days_to_complete": {}}
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# Seconds since 1970-01-01 00:00:00 of a "YYYY-MM-DD HH:MM:SS" (or
+# "YYYY-MM-DD") timestamp, or None. Timestamps are naive local time and are
+# counted on the calendar, without time zone conversion, so they round-trip.
+def parse_timestamp(text):
+    try:
+        moment = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+    return ((moment.toordinal() - _EPOCH_ORDINAL) * 86400
+            + moment.hour * 3600 + moment.minute * 60 + moment.second)
+
+
+# Date ordinal of a "YYYY-MM-DD" due date, or None
+def due_ordinal(due_date_str):
+    if not due_date_str:
+        return None
+    try:
+        return date.fromisoformat(due_date_str).toordinal()
+    except ValueError:
+        return None
+
+
+def format_timestamp(seconds):
+    days, rest = divmod(seconds, 86400)
+    return "%s %02d:%02d:%02d" % (_day_string(days), rest // 3600, rest // 60 % 60, rest % 60)
+
+
+# "YYYY-MM-DD" of a day number; tasks share few distinct days
+@lru_cache(maxsize=4096)
+def _day_string(days):
+    return date.fromordinal(_EPOCH_ORDINAL + days).isoformat()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _label_tuple(labels):
+    if not labels:
+        return ()
+    try:
+        return tuple(map(sys.intern, labels))
+    except TypeError:
+        return tuple(map(_intern, labels))
+
+
+class Task:
+    """One active or completed task, kept compact in memory.
+
+    Timestamps are integer seconds (see ``parse_timestamp``), the due date
+    a date ordinal, labels a tuple of interned strings and the category an
+    interned string; unknown keys are kept in ``extra``. Records without a
+    name get their legacy ``text`` as the name when they are read, so
+    nothing downstream needs the fallback.
+
+    Tasks read and write like the dicts of the JSON layout
+    (``task["completed_at"]``, ``task.get("labels", [])``, ``dict(task)``),
+    converting only the field asked for. Hot paths use the attributes.
+    Values that cannot be parsed are kept verbatim in ``extra``.
+    """
+
+    __slots__ = ("id", "name", "description", "created", "due", "priority", "labels",
+                 "completed", "category", "extra")
+
+    def __init__(self, task_id, name, description="", created=None, due=None, priority=0,
+                 labels=(), completed=None, category=None, extra=None):
+        self.id = task_id
+        self.name = name
+        self.description = description
+        self.created = created
+        self.due = due
+        self.priority = priority
+        self.labels = labels
+        self.completed = completed
+        self.category = category
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, record):
+        task = cls(record.get("id"), record.get("name"), record.get("description") or "",
+                   priority=record.get("priority", 0), labels=_label_tuple(record.get("labels")),
+                   category=_intern(record.get("category")))
+        for key, attribute, parse in _PARSED_FIELDS:
+            value = record.get(key)
+            if value:
+                parsed = parse(value)
+                if parsed is None:
+                    task._set_extra(key, value)
+                else:
+                    setattr(task, attribute, parsed)
+        if not _FIELDS.issuperset(record):
+            for key in record.keys() - _FIELDS:
+                task._set_extra(key, record[key])
+        if task.name is None:
+            task.name = record.get("text") or "Untitled"
+            task._discard_extra("text")
+        return task
+
+    def to_dict(self):
+        record = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "created_at": None if self.created is None else format_timestamp(self.created),
+            "due_date": None if self.due is None else _day_string(self.due - _EPOCH_ORDINAL),
+            "priority": self.priority,
+            "labels": list(self.labels)
+        }
+        if self.completed is not None:
+            record["completed_at"] = format_timestamp(self.completed)
+        if self.category is not None:
+            record["category"] = self.category
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def _set_extra(self, key, value):
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def _discard_extra(self, key):
+        if self.extra is not None:
+            self.extra.pop(key, None)
+            if not self.extra:
+                self.extra = None
+
+    def __getitem__(self, key):
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        getter = _GETTERS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self)
+
+    def __setitem__(self, key, value):
+        setter = _SETTERS.get(key)
+        if setter is None:
+            self._set_extra(key, value)
+            return
+        if self.extra is not None:
+            self._discard_extra(key)
+        if setter(self, value) is False:
+            # Unparseable timestamp or date: keep the text as it was
+            self._set_extra(key, value)
+
+    def __contains__(self, key):
+        try:
+            value = self[key]
+        except KeyError:
+            return False
+        return value is not None or key not in _OPTIONAL_FIELDS
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None and key in _OPTIONAL_FIELDS else value
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+def _set_timestamp(attribute):
+    def setter(task, value):
+        seconds = parse_timestamp(value) if value is not None else None
+        setattr(task, attribute, seconds)
+        return seconds is not None or value is None
+    return setter
+
+
+def _set_due(task, value):
+    task.due = due_ordinal(value)
+    return task.due is not None or not value
+
+
+_GETTERS = {
+    "id": lambda task: task.id,
+    "name": lambda task: task.name,
+    "description": lambda task: task.description,
+    "created_at": lambda task: None if task.created is None else format_timestamp(task.created),
+    "due_date": lambda task: None if task.due is None else _day_string(task.due - _EPOCH_ORDINAL),
+    "priority": lambda task: task.priority,
+    "labels": lambda task: list(task.labels),
+    "completed_at": lambda task: None if task.completed is None else format_timestamp(task.completed),
+    "category": lambda task: task.category
+}
+
+_SETTERS = {
+    "id": lambda task, value: setattr(task, "id", value),
+    "name": lambda task, value: setattr(task, "name", value),
+    "description": lambda task, value: setattr(task, "description", value or ""),
+    "created_at": _set_timestamp("created"),
+    "due_date": _set_due,
+    "priority": lambda task, value: setattr(task, "priority", value),
+    "labels": lambda task, value: setattr(task, "labels", _label_tuple(value)),
+    "completed_at": _set_timestamp("completed"),
+    "category": lambda task, value: setattr(task, "category", _intern(value))
+}
+
+# Keys only completed tasks have
+_OPTIONAL_FIELDS = ("completed_at", "category")
+_FIELDS = frozenset(_SETTERS)
+# Text fields parsed into (key, attribute, parser returning None if invalid)
+_PARSED_FIELDS = (
+    ("created_at", "created", parse_timestamp),
+    ("due_date", "due", due_ordinal),
+    ("completed_at", "completed", parse_timestamp)
+)
+
+
+# Tasks in the JSON layout, for writing
+def task_records(tasks):
+    return [task.to_dict() for task in tasks]
+
+
+# Whole days between creation and completion, or None if either is unparseable
+def days_to_complete(task):
+    if isinstance(task, Task):
+        if task.created is None or task.completed is None:
+            return None
+        return (task.completed - task.created) // 86400
+    try:
+        created = datetime.strptime(task["created_at"], TIMESTAMP_FORMAT)
+        completed = datetime.strptime(task["completed_at"], TIMESTAMP_FORMAT)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (completed - created).days
+
+
+# (kind, key) aggregate entries a completed task counts towards
+def stats_keys(task):
+    day = task["completed_at"][:10]
+    keys = [("category", task["category"])]
+    # Same "YYYY-MM-DD" format as due dates
+    if due_ordinal(day) is not None:
+        keys.append(("day", day))
+    if days_to_complete(task) is not None:
+        keys.append(("days_to_complete", task["category"]))
+    return keys
+
+
+# Add (sign=1) or remove (sign=-1) one completed task from the aggregates
+def update_stats(stats, task, sign):
+    for kind, key in stats_keys(task):
+        counts = stats[kind]
+        if kind == "days_to_complete":
+            total = counts.setdefault(key, [0, 0])
+            total[0] += sign * days_to_complete(task)
+            total[1] += sign
+            if total[1] <= 0:
+                del counts[key]
+        else:
+            counts[key] = counts.get(key, 0) + sign
+            if counts[key] <= 0:
+                del counts[key]
+
+
+# Aggregates rebuilt from scratch, to initialize or verify stored ones
+def compute_stats(completed_tasks):
+    stats = empty_stats()
+    for task in completed_tasks:
+        update_stats(stats, task, 1)
+    return stats
+
+
+# Archive segment a completed task belongs to
+def archive_month(task):
+    return task["completed_at"][:7]
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """Inverted index over task names, descriptions and labels.
+
+    ``postings`` maps token -> {task id: weighted term frequency}; name
+    tokens count twice. ``vocabulary`` is the sorted list of tokens, so the
+    last query word can match as a prefix while typing. It is sorted once on
+    the first search; tokens added or removed later are patched in on the
+    next search, or the list is sorted again after many changes.
+    """
+
+    # Changed tokens patched into the vocabulary one by one; more are re-sorted
+    VOCABULARY_PATCH_LIMIT = 100
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}
+        self._vocabulary = None
+        self._changed = set()
+
+    @property
+    def vocabulary(self):
+        vocabulary = self._vocabulary
+        if vocabulary is None or len(self._changed) > self.VOCABULARY_PATCH_LIMIT:
+            vocabulary = self._vocabulary = sorted(self.postings)
+        else:
+            for token in self._changed:
+                pos = bisect_left(vocabulary, token)
+                listed = pos < len(vocabulary) and vocabulary[pos] == token
+                if token in self.postings and not listed:
+                    vocabulary.insert(pos, token)
+                elif token not in self.postings and listed:
+                    del vocabulary[pos]
+        self._changed.clear()
+        return vocabulary
+
+    def _token_changed(self, token):
+        if self._vocabulary is not None:
+            self._changed.add(token)
+
+    def add(self, task):
+        task_id = task.id
+        if task_id in self.docs:
+            self.remove(task_id)
+        terms = Counter(tokenize(" ".join((task.description or "",) + task.labels)))
+        for token in tokenize(task.name):
+            terms[token] += 2
+        self.docs[task_id] = terms
+        postings = self.postings
+        for token, weight in terms.items():
+            posting = postings.get(token)
+            if posting is None:
+                posting = postings[token] = {}
+                self._token_changed(token)
+            posting[task_id] = weight
+
+    def remove(self, task_id):
+        for token in self.docs.pop(task_id, ()):
+            posting = self.postings[token]
+            del posting[task_id]
+            if not posting:
+                del self.postings[token]
+                self._token_changed(token)
+
+    # Ids of tasks containing every query word (the last one as a prefix),
+    # best matches first, ranked by term frequency times inverse document frequency
+    def search(self, query, limit=50):
+        words = tokenize(query)
+        if not words:
+            return []
+        groups = [self.postings.get(word, {}) for word in words[:-1]]
+        last = {}
+        start = bisect_left(self.vocabulary, words[-1])
+        for token in self.vocabulary[start:]:
+            if not token.startswith(words[-1]):
+                break
+            for task_id, weight in self.postings[token].items():
+                last[task_id] = max(last.get(task_id, 0), weight)
+        groups.append(last)
+        groups.sort(key=len)
+        if not groups[0]:
+            return []
+        total = len(self.docs)
+        idfs = [math.log(1 + total / len(group)) for group in groups]
+        scores = {}
+        for task_id, weight in groups[0].items():
+            score = weight * idfs[0]
+            for group, idf in zip(groups[1:], idfs[1:]):
+                other = group.get(task_id)
+                if other is None:
+                    break
+                score += other * idf
+            else:
+                scores[task_id] = score
+        return heapq.nlargest(limit, scores, key=scores.get)
+
+
+class TaskIndex:
+    """Maps task ids to their position in a data set.
+
+    ``active`` maps id -> (category, position) and ``completed`` maps
+    id -> position in ``completed_tasks``. ``labels`` maps
+    category -> label -> set of active task ids. ``due`` maps active task
+    ids with a due date to its parsed date ordinal. All list mutations made by
+    ``apply_operation`` go through this class so the index never drifts.
+    The full-text ``search`` index over active and completed tasks is built
+    on first use and kept up to date from then on.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.active = {}
+        self.completed = {}
+        self.labels = {category: {} for category in data["tasks"]}
+        self.due = {}
+        self._search = None
+        for category, task_list in data["tasks"].items():
+            for pos, task in enumerate(task_list):
+                self.active[task["id"]] = (category, pos)
+                self._add_to_indexes(category, task)
+        for pos, task in enumerate(data["completed_tasks"]):
+            self.completed[task["id"]] = pos
+
+    @property
+    def search(self):
+        if self._search is None:
+            search = SearchIndex()
+            for task_list in self.data["tasks"].values():
+                for task in task_list:
+                    search.add(task)
+            for task in self.data["completed_tasks"]:
+                search.add(task)
+            self._search = search
+        return self._search
+
+    def _add_to_indexes(self, category, task):
+        if task.due is not None:
+            self.due[task.id] = task.due
+        postings = self.labels.setdefault(category, {})
+        for label in task.labels:
+            postings.setdefault(label, set()).add(task.id)
+        if self._search is not None:
+            self._search.add(task)
+
+    def _remove_from_indexes(self, category, task):
+        self.due.pop(task.id, None)
+        if self._search is not None:
+            self._search.remove(task.id)
+        postings = self.labels[category]
+        for label in task.labels:
+            ids = postings.get(label)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del postings[label]
+
+    # Labels used by at least one active task in category
+    def category_labels(self, category):
+        return self.labels.get(category, {}).keys()
+
+    # Active tasks in category carrying any (or all) of labels, in list order
+    def filter_by_labels(self, category, labels, match_all=False):
+        postings = self.labels.get(category, {})
+        id_sets = [postings.get(label, set()) for label in labels]
+        if not id_sets:
+            return list(self.data["tasks"][category])
+        ids = set.intersection(*id_sets) if match_all else set().union(*id_sets)
+        task_list = self.data["tasks"][category]
+        return [task_list[pos] for pos in sorted(self.active[task_id][1] for task_id in ids)]
+
+    # Active task in category, or None
+    def get_active(self, category, task_id):
+        location = self.active.get(task_id)
+        if location is None or location[0] != category:
+            return None
+        return self.data["tasks"][category][location[1]]
+
+    def get_completed(self, task_id):
+        pos = self.completed.get(task_id)
+        return None if pos is None else self.data["completed_tasks"][pos]
+
+    def update_active(self, category, task_id, fields):
+        task = self.get_active(category, task_id)
+        self._remove_from_indexes(category, task)
+        task.update(fields)
+        self._add_to_indexes(category, task)
+
+    def pop_active(self, category, task_id):
+        task_list = self.data["tasks"][category]
+        pos = self.active.pop(task_id)[1]
+        task = task_list.pop(pos)
+        self._remove_from_indexes(category, task)
+        # Only tasks after the removed one change position
+        for i in range(pos, len(task_list)):
+            self.active[task_list[i]["id"]] = (category, i)
+        return task
+
+    # Insert task at the position its priority sorts to
+    def insert_active(self, category, task):
+        task_list = self.data["tasks"][category]
+        pos = _insert_position(task_list, task.get("priority", 0))
+        task_list.insert(pos, task)
+        for i in range(pos, len(task_list)):
+            self.active[task_list[i]["id"]] = (category, i)
+        self._add_to_indexes(category, task)
+
+    def append_completed(self, task):
+        self.data["completed_tasks"].append(task)
+        self.completed[task["id"]] = len(self.data["completed_tasks"]) - 1
+        if self._search is not None:
+            self._search.add(task)
+
+    def pop_completed(self, task_id):
+        completed = self.data["completed_tasks"]
+        pos = self.completed.pop(task_id)
+        task = completed.pop(pos)
+        for i in range(pos, len(completed)):
+            self.completed[completed[i]["id"]] = i
+        if self._search is not None:
+            self._search.remove(task_id)
+        return task
+
+    def clear_completed(self):
+        if self._search is not None:
+            for task_id in self.completed:
+                self._search.remove(task_id)
+        self.data["completed_tasks"].clear()
+        self.completed.clear()
+
+    # Remove completed tasks finished before a timestamp; returns how many
+    def drop_completed_before(self, before):
+        before = parse_timestamp(before)
+        completed = self.data["completed_tasks"]
+        kept = [task for task in completed if _completed_order(task) >= before]
+        dropped = len(completed) - len(kept)
+        if dropped and self._search is not None:
+            for task in completed:
+                if _completed_order(task) < before:
+                    self._search.remove(task.id)
+        if dropped:
+            completed[:] = kept
+            self.completed = {task["id"]: pos for pos, task in enumerate(kept)}
+        return dropped
+
+
+def _priority(task):
+    return task.priority
+
+
+# Tasks due within this many days (and not overdue) count as due soon
+DUE_SOON_DAYS = 3
+
+
+# Sort active tasks into overdue / soon / later / none buckets for a day.
+# Returns per-task (bucket, days left) and the number of tasks per bucket.
+def compute_due_buckets(index, today_ordinal):
+    status = {}
+    counts = {"overdue": 0, "soon": 0, "later": 0, "none": len(index.active) - len(index.due)}
+    for task_id, due in index.due.items():
+        days_left = due - today_ordinal
+        if days_left < 0:
+            bucket = "overdue"
+        elif days_left <= DUE_SOON_DAYS:
+            bucket = "soon"
+        else:
+            bucket = "later"
+        status[task_id] = (bucket, days_left)
+        counts[bucket] += 1
+    return {"status": status, "counts": counts}
+
+
+# Completed tasks matching a case-insensitive text in name, description or
+# labels and completed between two dates (inclusive), sorted "newest",
+# "oldest" or by "category" and then newest first
+def query_completed(tasks, text="", start=None, end=None, sort="newest"):
+    text = text.strip().lower()
+    start = parse_timestamp(start.isoformat()) if start else None
+    # Compare against the start of the day after end
+    end = parse_timestamp((end + timedelta(days=1)).isoformat()) if end else None
+    matches = []
+    for task in tasks:
+        completed = _completed_order(task)
+        if start is not None and completed < start:
+            continue
+        if end is not None and completed >= end:
+            continue
+        if text and not (
+            text in task.name.lower()
+            or text in task.description.lower()
+            or any(text in label.lower() for label in task.labels)
+        ):
+            continue
+        matches.append(task)
+    # Already in completion order in practice, so this is close to linear
+    matches.sort(key=_completed_order, reverse=sort != "oldest")
+    if sort == "category":
+        # Stable sort keeps newest first within each category
+        order = {category: pos for pos, category in enumerate(CATEGORIES)}
+        matches.sort(key=lambda task: order.get(task["category"], len(order)))
+    return matches
+
+
+# Position after the last task whose priority is <= priority (lists are sorted)
+def _insert_position(task_list, priority):
+    lo, hi = 0, len(task_list)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _priority(task_list[mid]) <= priority:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+# Order key strictly between two neighbouring keys (None for a list end),
+# or None when there is no room left between them
+def order_key_between(before, after):
+    if before is None and after is None:
+        return 0
+    if before is None:
+        return math.floor(after) - 1
+    if after is None:
+        return math.floor(before) + 1
+    key = (before + after) / 2
+    return key if before < key < after else None
+
+
+# Unique task id: creation time (so ids still sort by age) plus a random
+# suffix, since many tasks can be created within the same microsecond
+def new_task_id():
+    return f"{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+# Order key for a new task at the end of a list
+def next_order_key(task_list):
+    return order_key_between(_priority(task_list[-1]) if task_list else None, None)
+
+
+# Operations that move a task to position in to_category, which may be its
+# own category to reorder it. Only the moved task gets a new priority, unless
+# the neighbouring keys have run out of room and the target is renumbered.
+def plan_move(data, index, from_category, task_id, to_category, position):
+    if index.get_active(from_category, task_id) is None:
+        return []
+    target = data["tasks"][to_category]
+    same = from_category == to_category
+    current = index.active[task_id][1]
+    # Positions and keys below refer to the target without the moved task
+    size = len(target) - 1 if same else len(target)
+    position = max(0, min(position, size))
+    if same and position == current:
+        return []
+
+    def key_at(p, renumbered):
+        if p < 0 or p >= size:
+            return None
+        if same and p >= current:
+            p += 1
+        return p if renumbered else _priority(target[p])
+
+    ops = []
+    key = order_key_between(key_at(position - 1, False), key_at(position, False))
+    if key is None:
+        ops.append({"op": "renumber_tasks", "category": to_category})
+        key = order_key_between(key_at(position - 1, True), key_at(position, True))
+    ops.append({
+        "op": "move_task",
+        "from_category": from_category,
+        "to_category": to_category,
+        "task_id": task_id,
+        "priority": key
+    })
+    return ops
+
+
+# Apply a single operation to an in-memory data set.
+# Used for live mutations as well as for replaying the journal on startup,
+# so operations must carry every generated value (ids, timestamps).
+# Pass the data set's TaskIndex when applying more than one operation.
+def apply_operation(data, op, index=None):
+    if index is None:
+        index = TaskIndex(data)
+    kind = op["op"]
+    tasks = data["tasks"]
+
+    if kind == "add_task":
+        # A new object, so the operation keeps describing the task as it was added
+        index.insert_active(op["category"], Task.from_dict(op["task"]))
+        return True
+
+    if kind == "edit_task":
+        if index.get_active(op["category"], op["task_id"]) is None:
+            return False
+        index.update_active(op["category"], op["task_id"], op["fields"])
+        return True
+
+    if kind == "move_task":
+        if index.get_active(op["from_category"], op["task_id"]) is None:
+            return False
+        task = index.pop_active(op["from_category"], op["task_id"])
+        task["priority"] = op["priority"]
+        index.insert_active(op["to_category"], task)
+        return True
+
+    if kind == "renumber_tasks":
+        for idx, t in enumerate(tasks[op["category"]]):
+            t["priority"] = idx
+        return True
+
+    if kind == "complete_task":
+        if index.get_active(op["category"], op["task_id"]) is None:
+            return False
+        task = index.pop_active(op["category"], op["task_id"])
+        task["completed_at"] = op["completed_at"]
+        task["category"] = op["category"]
+        index.append_completed(task)
+        _update_data_stats(data, task, 1)
+        return True
+
+    if kind == "delete_task":
+        if index.get_active(op["category"], op["task_id"]) is None:
+            return False
+        index.pop_active(op["category"], op["task_id"])
+        return True
+
+    if kind == "delete_completed_task":
+        if index.get_completed(op["task_id"]) is None:
+            return False
+        _update_data_stats(data, index.pop_completed(op["task_id"]), -1)
+        return True
+
+    if kind == "clear_completed":
+        index.clear_completed()
+        data["archive"].clear()
+        if data.get("stats") is not None:
+            data["stats"] = empty_stats()
+        return True
+
+    # Completed tasks were written to archive segments before this is applied;
+    # months carries the resulting segment sizes
+    if kind == "archive_completed":
+        index.drop_completed_before(op["before"])
+        data["archive"].update(op["months"])
+        return True
+
+    if kind == "delete_archived_task":
+        # "task" holds the fields the statistics aggregates need
+        if "task" in op:
+            _update_data_stats(data, op["task"], -1)
+        if op["count"]:
+            data["archive"][op["month"]] = op["count"]
+        else:
+            data["archive"].pop(op["month"], None)
+        return True
+
+    raise ValueError(f"Unknown operation: {kind}")
+
+
+# Aggregates are None until built for data written before they existed
+def _update_data_stats(data, task, sign):
+    if data.get("stats") is not None:
+        update_stats(data["stats"], task, sign)
+
+
+# Exclusive advisory lock on a sidecar file, shared by all processes.
+# Without fcntl (Windows) writes are still atomic but not serialized.
+@contextmanager
+def file_lock(path):
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# Minified JSON as UTF-8 bytes, encoded with orjson when it is installed
+def dump_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def load_json(payload):
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+# Read a JSON file, gzip-compressed if its name ends in .gz
+def read_json_file(path):
+    with open(path, "rb") as f:
+        payload = f.read()
+    if Path(path).suffix == ".gz":
+        payload = gzip.decompress(payload)
+    return load_json(payload)
+
+
+# Write JSON to a temp file in the same directory, fsync it and rename it over
+# path, so readers only ever see the old or the new complete file
+def atomic_write_json(path, obj, compress=False):
+    path = Path(path)
+    payload = dump_json(obj)
+    if compress:
+        payload = gzip.compress(payload, compresslevel=6, mtime=0)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+# Identifies one version of a file on disk without reading it
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class JsonStorage:
+    """Stores the whole data set as a single JSON document.
+
+    Writes are atomic and serialized across processes with a lock file.
+    Each write bumps a ``version`` counter; a commit based on a version that
+    is no longer on disk reloads the file and re-applies its operations on
+    top instead of overwriting the other writer's changes.
+    """
+
+    def __init__(self, path, archive_dir=None):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.archive_dir = Path(archive_dir) if archive_dir else self.path.with_name(self.path.stem + "_archive")
+        self.version = 0
+        self.schema = SCHEMA_VERSION
+        self.signature = None
+
+    # hot_since is accepted for interface parity with SqliteStorage; the
+    # snapshot only ever holds tasks that have not been archived
+    def load(self, hot_since=None):
+        return self._load_snapshot()[0]
+
+    # Returns the data set and the raw document it was read from
+    def _load_snapshot(self):
+        data = empty_data()
+        saved = {}
+        signature = file_signature(self.path)
+        if signature is not None:
+            saved = read_json_file(self.path)
+            data["tasks"] = {
+                category: [Task.from_dict(task) for task in task_list]
+                for category, task_list in saved.get("tasks", data["tasks"]).items()
+            }
+            data["completed_tasks"] = [Task.from_dict(task) for task in saved.get("completed_tasks", [])]
+            data["label_colors"] = saved.get("label_colors", {})
+            data["archive"] = saved.get("archive", {})
+            data["stats"] = saved.get("stats")
+        self.version = saved.get("version", 0)
+        # A missing file is created in the current layout
+        self.schema = saved.get("schema", 1) if saved else SCHEMA_VERSION
+        self.signature = signature
+        return data, saved
+
+    # True when another writer changed the file since we loaded or wrote it
+    def is_stale(self):
+        return file_signature(self.path) != self.signature
+
+    # Reload the current data and re-apply ops that still make sense on it
+    def _merge(self, ops):
+        fresh = self.load()
+        index = TaskIndex(fresh)
+        return fresh, [op for op in ops if apply_operation(fresh, op, index)]
+
+    # Persist operations that have already been applied to data.
+    # Returns the data set that is now current, which differs from data
+    # when the commit had to be merged with another writer's changes.
+    def commit(self, data, ops):
+        with file_lock(self.lock_path):
+            if self.is_stale():
+                data, ops = self._merge(ops)
+            self._write_snapshot(data)
+        return data
+
+    # Overwrite the stored data set with data, after prepare(data) if given.
+    # If another writer changed the file since data was loaded, the stored
+    # data set is loaded and prepared instead, so no change is lost; prepare
+    # can return a false value to skip the write. Returns the data set that
+    # is now current.
+    def save(self, data, prepare=None):
+        with file_lock(self.lock_path):
+            if self.is_stale():
+                data = self.load()
+            if prepare is None or prepare(data):
+                self._write_snapshot(data)
+        return data
+
+    def _snapshot(self, data):
+        return {
+            "schema": SCHEMA_VERSION,
+            "version": self.version + 1,
+            "tasks": {category: task_records(task_list) for category, task_list in data["tasks"].items()},
+            "completed_tasks": task_records(data["completed_tasks"]),
+            "label_colors": data["label_colors"],
+            "archive": data["archive"],
+            "stats": data["stats"]
+        }
+
+    def _write_snapshot(self, data):
+        snapshot = self._snapshot(data)
+        atomic_write_json(self.path, snapshot)
+        self.version = snapshot["version"]
+        self.schema = SCHEMA_VERSION
+        self.signature = file_signature(self.path)
+
+    # Archive segments: one gzip-compressed JSON file of completed tasks per
+    # month
+
+    def _segment_path(self, month):
+        return self.archive_dir / f"completed_{month}.json.gz"
+
+    def load_archive(self, month):
+        path = self._segment_path(month)
+        if not path.exists():
+            return []
+        return [Task.from_dict(task) for task in read_json_file(path)["tasks"]]
+
+    def _write_segment(self, month, tasks):
+        if tasks:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self._segment_path(month),
+                              {"schema": SCHEMA_VERSION, "month": month, "tasks": task_records(tasks)},
+                              compress=True)
+        elif self._segment_path(month).exists():
+            os.remove(self._segment_path(month))
+
+    # Add completed tasks to their month's segment (skipping ids already
+    # there, so an interrupted archive run can be repeated). Returns the
+    # resulting number of tasks per touched month.
+    def archive_tasks(self, tasks_by_month, before):
+        counts = {}
+        with file_lock(self.lock_path):
+            for month, tasks in tasks_by_month.items():
+                segment = self.load_archive(month)
+                known = {task.id for task in segment}
+                segment.extend(task for task in tasks if task.id not in known)
+                segment.sort(key=_completed_order)
+                self._write_segment(month, segment)
+                counts[month] = len(segment)
+        return counts
+
+    # Remove tasks from a segment; returns the segment's new size
+    def remove_archived_tasks(self, month, task_ids):
+        with file_lock(self.lock_path):
+            segment = [task for task in self.load_archive(month) if task.id not in task_ids]
+            self._write_segment(month, segment)
+        return len(segment)
+
+    def clear_archive(self):
+        with file_lock(self.lock_path):
+            for path in self.archive_dir.glob("completed_*.json.gz"):
+                os.remove(path)
+
+
+# Completed tasks are stored in the order they were completed
+def _completed_order(task):
+    return task.completed if task.completed is not None else 0
+
+
+class JournalStorage(JsonStorage):
+    """Snapshot in JSON plus an append-only JSONL journal of operations.
+
+    Each mutation appends one line to the journal instead of rewriting the
+    snapshot. The journal is folded into the snapshot every
+    ``compact_every`` operations. On load the snapshot is read and every
+    journal entry newer than the snapshot's ``journal_seq`` is replayed.
+    """
+
+    def __init__(self, path, journal_path, compact_every=JOURNAL_COMPACT_EVERY, archive_dir=None):
+        super().__init__(path, archive_dir)
+        self.journal_path = Path(journal_path)
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self.journal_signature = None
+        # Bytes of the journal up to the end of its last complete entry
+        self.journal_length = 0
+
+    def load(self, hot_since=None):
+        data, saved = self._load_snapshot()
+        self.seq = saved.get("journal_seq", 0)
+        self.pending = 0
+        self.journal_signature = file_signature(self.journal_path)
+        self.journal_length = 0
+        index = TaskIndex(data)
+        for entry in self._read_journal():
+            # Entries already folded into the snapshot survive a crash
+            # between writing the snapshot and truncating the journal
+            if entry["seq"] <= self.seq:
+                continue
+            apply_operation(data, entry["op"], index)
+            self.seq = entry["seq"]
+            self.pending += 1
+        return data
+
+    def _read_journal(self):
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                # A line without its newline is a torn write from a crash
+                # mid-append; nothing after it is valid
+                if not line.endswith(b"\n"):
+                    return
+                if line.strip():
+                    try:
+                        entry = load_json(line)
+                    except ValueError:
+                        return
+                    yield entry
+                self.journal_length += len(line)
+
+    # Cut a torn tail off the journal before appending, so new entries do
+    # not end up on the same line as the partial one. Called with the lock
+    # held and the journal as last loaded.
+    def _truncate_torn_tail(self):
+        signature = self.journal_signature
+        if signature is not None and signature[2] > self.journal_length:
+            os.truncate(self.journal_path, self.journal_length)
+
+    def is_stale(self):
+        return (super().is_stale()
+                or file_signature(self.journal_path) != self.journal_signature)
+
+    def commit(self, data, ops):
+        with file_lock(self.lock_path):
+            if self.is_stale():
+                data, ops = self._merge(ops)
+            self._truncate_torn_tail()
+            lines = []
+            for op in ops:
+                self.seq += 1
+                lines.append(dump_json({"seq": self.seq, "op": op}) + b"\n")
+            with open(self.journal_path, "ab") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_signature = file_signature(self.journal_path)
+            self.journal_length = self.journal_signature[2]
+            self.pending += len(ops)
+            if self.pending >= self.compact_every:
+                self._compact(data)
+        return data
+
+    # Full saves go through compaction so the journal stays consistent;
+    # see JsonStorage.save
+    def save(self, data, prepare=None):
+        with file_lock(self.lock_path):
+            if self.is_stale():
+                data = self.load()
+            if prepare is None or prepare(data):
+                self._compact(data)
+        return data
+
+    def compact(self, data):
+        with file_lock(self.lock_path):
+            if self.is_stale():
+                data, _ = self._merge([])
+            self._compact(data)
+        return data
+
+    def _compact(self, data):
+        snapshot = self._snapshot(data)
+        snapshot["journal_seq"] = self.seq
+        atomic_write_json(self.path, snapshot)
+        self.version = snapshot["version"]
+        self.schema = SCHEMA_VERSION
+        self.signature = file_signature(self.path)
+        with open(self.journal_path, "w"):
+            pass
+        self.journal_signature = file_signature(self.journal_path)
+        self.journal_length = 0
+        self.pending = 0
+
+
+class SharedStore:
+    """Process-wide data set shared by all sessions.
+
+    The stored data is only reloaded when the backend reports that another
+    process changed it, so a rerun costs a stat() instead of a full parse.
+    Sessions read ``data`` directly; all mutations go through ``commit``.
+    ``version`` increases on every change; together with ``instance``, which
+    is unique per store object, it can be used as a cache key that outlives
+    the store.
+
+    Only completed tasks from the last ``archive_after_days`` days are kept
+    in ``data``; older ones are moved to the storage's monthly archive on
+    reload and read back per month by ``completed_tasks``.
+    """
+
+    def __init__(self, storage, default_label_colors=None, archive_after_days=ARCHIVE_AFTER_DAYS):
+        self.storage = storage
+        self.default_label_colors = default_label_colors or {}
+        self.archive_after_days = archive_after_days
+        self.lock = threading.RLock()
+        self.data = None
+        self.index = None
+        self.instance = uuid.uuid4().hex
+        self.version = 0
+        self._due_buckets = None
+        self._due_buckets_key = None
+        # Archive month -> tasks, in least recently used order
+        self._archive_cache = OrderedDict()
+        # Cutoff of the last archive rotation; None forces the next one
+        self._archived_before = None
+        self.refresh()
+
+    # Reload from storage if it changed on disk, and archive tasks that left
+    # the hot window since the last rotation; returns the current data
+    def refresh(self):
+        with self.lock:
+            if self.data is None or self.storage.is_stale():
+                self._reload()
+                self._rotate_archive()
+            elif self._archived_before != self._archive_cutoff():
+                self._rotate_archive()
+            return self.data
+
+    def _reload(self):
+        data = self.storage.load(self._archive_cutoff())
+        self._adopt(data)
+        self.version += 1
+        if self.storage.schema == SCHEMA_VERSION and data["stats"] is not None:
+            return
+        # Written by an older version (records were normalized while loading)
+        # or stored before aggregates existed: save it in the current layout
+        self._save(self._build_missing_stats)
+
+    # Make data, as loaded from storage, the current data set
+    def _adopt(self, data):
+        # Lists are kept in priority order from here on
+        for task_list in data["tasks"].values():
+            task_list.sort(key=_priority)
+        for label, color in self.default_label_colors.items():
+            data["label_colors"].setdefault(label, color)
+        self.data = data
+        self.index = TaskIndex(data)
+        self._archive_cache.clear()
+
+    # Overwrite the stored data set with the current one through the
+    # storage's stale check (see JsonStorage.save)
+    def _save(self, prepare=None):
+        with self.lock:
+            data = self.storage.save(self.data, prepare)
+            if data is not self.data:
+                # Another process had changed the stored data
+                self._adopt(data)
+            self.version += 1
+
+    def _build_missing_stats(self, data):
+        if data["stats"] is None:
+            data["stats"] = compute_stats(self._stored_completed_tasks(data))
+        return True
+
+    # Every completed task of a data set as stored, archived ones included
+    def _stored_completed_tasks(self, data):
+        tasks = []
+        for month in sorted(data["archive"]):
+            tasks.extend(self.storage.load_archive(month))
+        tasks.extend(data["completed_tasks"])
+        return tasks
+
+    # completed_at timestamps before this string belong in the archive
+    def _archive_cutoff(self):
+        cutoff = date.today() - timedelta(days=self.archive_after_days)
+        return cutoff.isoformat()
+
+    # Move completed tasks that left the hot window into archive segments
+    def _rotate_archive(self):
+        before = self._archive_cutoff()
+        self._archived_before = before
+        before_seconds = parse_timestamp(before)
+        tasks_by_month = {}
+        for task in self.data["completed_tasks"]:
+            if _completed_order(task) < before_seconds:
+                tasks_by_month.setdefault(archive_month(task), []).append(task)
+        if not tasks_by_month:
+            return
+        # Segments are written first; the operation only drops tasks that
+        # are already safe on disk
+        months = self.storage.archive_tasks(tasks_by_month, before)
+        self.commit([{"op": "archive_completed", "before": before, "months": months}])
+
+    # Apply and persist operations; returns the operations that took effect
+    def commit(self, ops):
+        with self.lock:
+            applied = [op for op in ops if apply_operation(self.data, op, self.index)]
+            if not applied:
+                return applied
+            try:
+                data = self.storage.commit(self.data, applied)
+            except Exception:
+                # Memory is ahead of storage now; go back to what was saved
+                self._reload()
+                raise
+            if data is not self.data:
+                # Merged with another process's changes
+                self._adopt(data)
+            for op in applied:
+                if op["op"] in ("archive_completed", "delete_archived_task"):
+                    self._archive_cache.clear()
+                elif op["op"] == "complete_task" and op["completed_at"] < (self._archived_before or ""):
+                    # Completed before the hot window; archived on the next refresh
+                    self._archived_before = None
+            self.version += 1
+            return applied
+
+    # Number of completed tasks including the archive
+    def completed_count(self):
+        with self.lock:
+            return len(self.data["completed_tasks"]) + sum(self.data["archive"].values())
+
+    # Completed tasks finished on or after since (a date or timestamp
+    # string; None for all), oldest first. Archive months are read on demand.
+    def completed_tasks(self, since=None):
+        with self.lock:
+            months = [month for month in sorted(self.data["archive"]) if since is None or month >= since[:7]]
+            # Caching a scan over more months than the cache holds would only
+            # evict every month before it is read again
+            cache = len(months) <= ARCHIVE_CACHE_MONTHS
+            tasks = []
+            for month in months:
+                tasks.extend(self._archive_segment(month, cache))
+            tasks.extend(self.data["completed_tasks"])
+            if since is not None:
+                # since may be a month ("YYYY-MM"), as for archive lookups
+                since = parse_timestamp(since if len(since) > 7 else since + "-01")
+                tasks = [task for task in tasks if _completed_order(task) >= since]
+            return tasks
+
+    # Tasks of one archive month, read through a small LRU cache so that
+    # the archive is never held in memory as a whole. With cache=False a
+    # month that is not cached yet is read without being added.
+    def _archive_segment(self, month, cache=True):
+        tasks = self._archive_cache.get(month)
+        if tasks is not None:
+            self._archive_cache.move_to_end(month)
+            return tasks
+        tasks = self.storage.load_archive(month)
+        if cache:
+            self._archive_cache[month] = tasks
+            while len(self._archive_cache) > ARCHIVE_CACHE_MONTHS:
+                self._archive_cache.popitem(last=False)
+        return tasks
+
+    # Delete completed tasks given as {task id: archive month}, whether they
+    # are still in memory or already archived, in a single commit
+    def delete_completed_tasks(self, months):
+        with self.lock:
+            ops = []
+            archived = {}
+            for task_id, month in months.items():
+                if self.index.get_completed(task_id) is not None:
+                    ops.append({"op": "delete_completed_task", "task_id": task_id})
+                elif month in self.data["archive"]:
+                    archived.setdefault(month, set()).add(task_id)
+            for month, task_ids in archived.items():
+                tasks = [task for task in self._archive_segment(month) if task.id in task_ids]
+                if not tasks:
+                    continue
+                # Segments are rewritten first, as when archiving
+                count = self.storage.remove_archived_tasks(month, task_ids)
+                ops.extend({
+                    "op": "delete_archived_task",
+                    "task_id": task.id,
+                    "month": month,
+                    "count": count,
+                    "task": {key: task.get(key) for key in ("category", "created_at", "completed_at")}
+                } for task in tasks)
+            return self.commit(ops)
+
+    # Aggregates recomputed from every completed task; replaces the stored
+    # ones and returns whether they had drifted
+    def rebuild_stats(self):
+        drifted = []
+
+        def rebuild(data):
+            stats = compute_stats(self._stored_completed_tasks(data))
+            drifted.append(stats != data["stats"])
+            data["stats"] = stats
+            return drifted[-1]
+
+        self._save(rebuild)
+        return drifted[-1]
+
+    def clear_completed(self):
+        with self.lock:
+            self.storage.clear_archive()
+            return self.commit([{"op": "clear_completed"}])
+
+    # Due date buckets for today, computed once per day and data version
+    def due_buckets(self):
+        today = date.today().toordinal()
+        with self.lock:
+            if self._due_buckets_key != (today, self.version):
+                self._due_buckets = compute_due_buckets(self.index, today)
+                self._due_buckets_key = (today, self.version)
+            return self._due_buckets
+
+    # Rewrite the whole stored data set from memory. If another process
+    # changed it meanwhile, its data set is written instead, keeping label
+    # colors set here that it does not have.
+    def save(self):
+        with self.lock:
+            label_colors = dict(self.data["label_colors"])
+
+            def add_label_colors(data):
+                for label, color in label_colors.items():
+                    data["label_colors"].setdefault(label, color)
+                return True
+
+            self._save(add_label_colors)
+
+    def set_label_color(self, label, color):
+        with self.lock:
+            self.data["label_colors"][label] = color
+
+    # Ranked full-text matches among active and not yet archived completed
+    # tasks: a list of (task, category, completed)
+    def search(self, query, limit=50):
+        with self.lock:
+            results = []
+            for task_id in self.index.search.search(query, limit):
+                if task_id in self.index.active:
+                    category, pos = self.index.active[task_id]
+                    results.append((self.data["tasks"][category][pos], category, False))
+                else:
+                    task = self.data["completed_tasks"][self.index.completed[task_id]]
+                    results.append((task, task["category"], True))
+            return results
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    created_at TEXT,
+    due_date TEXT,
+    priority REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+CREATE TABLE IF NOT EXISTS completed_tasks (
+    id TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    created_at TEXT,
+    completed_at TEXT NOT NULL,
+    due_date TEXT,
+    priority REAL
+);
+CREATE INDEX IF NOT EXISTS idx_completed_completed_at ON completed_tasks (completed_at);
+CREATE INDEX IF NOT EXISTS idx_completed_category ON completed_tasks (category, completed_at);
+CREATE TABLE IF NOT EXISTS labels (
+    name TEXT PRIMARY KEY,
+    color TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_labels (
+    task_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (task_id, label)
+);
+CREATE INDEX IF NOT EXISTS idx_task_labels_label ON task_labels (label, task_id);
+CREATE TABLE IF NOT EXISTS stats (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+class SqliteStorage:
+    """Stores tasks in SQLite (WAL mode) with one row per task.
+
+    Operations are persisted as single-row statements instead of rewriting
+    the whole data set. On first use an existing tasks_data.json is
+    imported once via ``migrate_json_to_sqlite``. Commits take SQLite's
+    write lock up front and merge with changes made by other connections.
+    Completed tasks older than ``hot_since`` stay on disk and are read per
+    month with ``load_archive``.
+    """
+
+    def __init__(self, path, legacy_json_path=None):
+        import sqlite3
+        self.path = Path(path)
+        self.legacy_json_path = Path(legacy_json_path) if legacy_json_path else None
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.saved_label_colors = {}
+        self.data_version = None
+        self.hot_since = None
+        # Rows are normalized when they are written; there is nothing to migrate
+        self.schema = SCHEMA_VERSION
+
+    def close(self):
+        self.conn.close()
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # Loads active tasks and completed tasks finished at or after hot_since
+    def load(self, hot_since=None):
+        if (self.legacy_json_path and self.legacy_json_path.exists()
+                and self._get_meta("migrated_from_json") is None):
+            migrate_json_to_sqlite(self.legacy_json_path, self)
+        if hot_since is not None:
+            self.hot_since = hot_since
+        hot_since = self.hot_since or ""
+
+        labels_by_task = {}
+        for task_id, label in self.conn.execute(
+                "SELECT task_id, label FROM task_labels WHERE task_id IN "
+                "(SELECT id FROM tasks UNION ALL SELECT id FROM completed_tasks WHERE completed_at >= ?) "
+                "ORDER BY task_id, position", (hot_since,)):
+            labels_by_task.setdefault(task_id, []).append(label)
+
+        data = empty_data()
+        for row in self.conn.execute(
+                "SELECT id, category, name, description, created_at, due_date, priority "
+                "FROM tasks ORDER BY category, priority, rowid"):
+            task = self._row_to_task(row[0], row[2:], labels_by_task)
+            data["tasks"].setdefault(row[1], []).append(task)
+        data["completed_tasks"] = self._load_completed("completed_at >= ?", (hot_since,), labels_by_task)
+        data["archive"] = dict(self.conn.execute(
+            "SELECT substr(completed_at, 1, 7), count(*) FROM completed_tasks "
+            "WHERE completed_at < ? GROUP BY 1", (hot_since,)
+        ))
+        data["label_colors"] = dict(self.conn.execute("SELECT name, color FROM labels"))
+        data["stats"] = self._load_stats()
+        self.saved_label_colors = dict(data["label_colors"])
+        self.data_version = self._data_version()
+        return data
+
+    def _load_completed(self, where, params, labels_by_task=None):
+        if labels_by_task is None:
+            labels_by_task = {}
+            for task_id, label in self.conn.execute(
+                    "SELECT task_id, label FROM task_labels WHERE task_id IN "
+                    f"(SELECT id FROM completed_tasks WHERE {where}) ORDER BY task_id, position", params):
+                labels_by_task.setdefault(task_id, []).append(label)
+        completed = []
+        for row in self.conn.execute(
+                "SELECT id, category, name, description, created_at, due_date, priority, completed_at "
+                f"FROM completed_tasks WHERE {where} ORDER BY rowid", params):
+            completed.append(self._row_to_task(row[0], row[2:7], labels_by_task,
+                                               completed_at=row[7], category=row[1]))
+        return completed
+
+    # Range of completed_at values archived in month
+    def _archive_range(self, month):
+        year, mon = int(month[:4]), int(month[5:7])
+        next_month = f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+        return month, min(next_month, self.hot_since or "")
+
+    def load_archive(self, month):
+        return self._load_completed("completed_at >= ? AND completed_at < ?", self._archive_range(month))
+
+    def _archive_count(self, month):
+        return self.conn.execute(
+            "SELECT count(*) FROM completed_tasks WHERE completed_at >= ? AND completed_at < ?",
+            self._archive_range(month)
+        ).fetchone()[0]
+
+    # Rows stay where they are; only the hot window moves
+    def archive_tasks(self, tasks_by_month, before):
+        self.hot_since = before
+        return {month: self._archive_count(month) for month in tasks_by_month}
+
+    def remove_archived_tasks(self, month, task_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM completed_tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+            self.conn.executemany("DELETE FROM task_labels WHERE task_id = ?", [(task_id,) for task_id in task_ids])
+        return self._archive_count(month)
+
+    # Archived rows are deleted by the clear_completed operation itself
+    def clear_archive(self):
+        pass
+
+    # Statistics aggregates, or None if they were never written
+    def _load_stats(self):
+        if self._get_meta("stats_built") is None:
+            return None
+        stats = empty_stats()
+        for kind, key, value in self.conn.execute("SELECT kind, key, value FROM stats"):
+            stats[kind][key] = json.loads(value)
+        return stats
+
+    # Store the current value of every aggregate entry task counts towards
+    def _write_stats(self, stats, task):
+        if stats is None:
+            return
+        for kind, key in stats_keys(task):
+            value = stats[kind].get(key)
+            if value is None:
+                self.conn.execute("DELETE FROM stats WHERE kind = ? AND key = ?", (kind, key))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO stats (kind, key, value) VALUES (?, ?, ?)",
+                    (kind, key, json.dumps(value))
+                )
+
+    # Changes whenever another connection commits to the database
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_stale(self):
+        return self._data_version() != self.data_version
+
+    @staticmethod
+    def _row_to_task(task_id, row, labels_by_task, **completion):
+        name, description, created_at, due_date, priority = row
+        if priority is not None and priority == int(priority):
+            priority = int(priority)
+        return Task.from_dict({
+            "id": task_id,
+            "name": name,
+            "description": description,
+            "created_at": created_at,
+            "due_date": due_date,
+            "priority": priority,
+            "labels": labels_by_task.get(task_id, ()),
+            **completion
+        })
+
+    @staticmethod
+    def _task_values(task):
+        return (
+            task["id"],
+            task["name"],
+            task["description"],
+            task["created_at"],
+            task["due_date"],
+            task["priority"]
+        )
+
+    def _insert_task(self, category, task):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO tasks (id, name, description, created_at, due_date, priority, category) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._task_values(task) + (category,)
+        )
+        self._insert_labels(task)
+
+    def _insert_completed(self, task):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO completed_tasks "
+            "(id, name, description, created_at, due_date, priority, category, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self._task_values(task) + (task["category"], task["completed_at"])
+        )
+        self._insert_labels(task)
+
+    def _insert_labels(self, task):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO task_labels (task_id, label, position) VALUES (?, ?, ?)",
+            [(task["id"], label, pos) for pos, label in enumerate(task["labels"])]
+        )
+
+    # Tasks touched by an operation were appended last, so search from the end.
+    # None when a later operation in the same commit moved the task on again;
+    # that operation writes its final state.
+    @staticmethod
+    def _find_appended(task_list, task_id):
+        return next((task for task in reversed(task_list) if task["id"] == task_id), None)
+
+    def _update_priorities(self, task_list):
+        self.conn.executemany(
+            "UPDATE tasks SET priority = ? WHERE id = ?",
+            [(task["priority"], task["id"]) for task in task_list]
+        )
+
+    # Write a single operation that has already been applied to data
+    def _write_operation(self, data, op):
+        kind = op["op"]
+        tasks = data["tasks"]
+
+        if kind == "add_task":
+            self._insert_task(op["category"], op["task"])
+        elif kind == "edit_task":
+            fields = op["fields"]
+            self.conn.execute(
+                "UPDATE tasks SET name = ?, description = ?, due_date = ? WHERE id = ?",
+                (fields["name"], fields["description"], fields["due_date"], op["task_id"])
+            )
+            self.conn.execute("DELETE FROM task_labels WHERE task_id = ?", (op["task_id"],))
+            self._insert_labels({"id": op["task_id"], "labels": fields["labels"]})
+        elif kind == "move_task":
+            self.conn.execute(
+                "UPDATE tasks SET category = ?, priority = ? WHERE id = ?",
+                (op["to_category"], op["priority"], op["task_id"])
+            )
+        elif kind == "renumber_tasks":
+            self._update_priorities(tasks[op["category"]])
+        elif kind == "complete_task":
+            task = self._find_appended(data["completed_tasks"], op["task_id"])
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (op["task_id"],))
+            if task is not None:
+                self._insert_completed(task)
+                self._write_stats(data["stats"], task)
+        elif kind == "delete_task":
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (op["task_id"],))
+            self.conn.execute("DELETE FROM task_labels WHERE task_id = ?", (op["task_id"],))
+        elif kind == "delete_completed_task":
+            row = self.conn.execute(
+                "SELECT category, created_at, completed_at FROM completed_tasks WHERE id = ?",
+                (op["task_id"],)
+            ).fetchone()
+            if row is not None:
+                self._write_stats(data["stats"], dict(zip(("category", "created_at", "completed_at"), row)))
+            self.conn.execute("DELETE FROM completed_tasks WHERE id = ?", (op["task_id"],))
+            self.conn.execute("DELETE FROM task_labels WHERE task_id = ?", (op["task_id"],))
+        elif kind == "clear_completed":
+            self.conn.execute(
+                "DELETE FROM task_labels WHERE task_id IN (SELECT id FROM completed_tasks)"
+            )
+            self.conn.execute("DELETE FROM completed_tasks")
+            self.conn.execute("DELETE FROM stats")
+        elif kind == "delete_archived_task":
+            # The row was already deleted by remove_archived_task
+            if "task" in op:
+                self._write_stats(data["stats"], op["task"])
+        elif kind == "archive_completed":
+            # Already written by archive_tasks
+            pass
+        else:
+            raise ValueError(f"Unknown operation: {kind}")
+
+    # Upsert label colors that changed since the last write
+    def _write_label_colors(self, label_colors):
+        changed = [(name, color) for name, color in list(label_colors.items())
+                   if self.saved_label_colors.get(name) != color]
+        if changed:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO labels (name, color) VALUES (?, ?)", changed
+            )
+            self.saved_label_colors.update(changed)
+
+    # Persist operations that have already been applied to data.
+    # Returns the data set that is now current (see JsonStorage.commit).
+    def commit(self, data, ops):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.is_stale():
+                fresh = self.load()
+                index = TaskIndex(fresh)
+                ops = [op for op in ops if apply_operation(fresh, op, index)]
+                fresh["label_colors"] = dict(data["label_colors"], **fresh["label_colors"])
+                data = fresh
+            for op in ops:
+                self._write_operation(data, op)
+            self._write_label_colors(data["label_colors"])
+        return data
+
+    # Replace the stored data set with data (see JsonStorage.save)
+    def save(self, data, prepare=None):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.is_stale():
+                data = self.load()
+            if prepare is None or prepare(data):
+                self._replace_all(data)
+        return data
+
+    # Archived rows (completed before hot_since) are not part of data and are kept
+    def _replace_all(self, data):
+        hot_since = self.hot_since or ""
+        self.conn.execute(
+            "DELETE FROM task_labels WHERE task_id NOT IN "
+            "(SELECT id FROM completed_tasks WHERE completed_at < ?)", (hot_since,)
+        )
+        self.conn.execute("DELETE FROM completed_tasks WHERE completed_at >= ?", (hot_since,))
+        for table in ("tasks", "labels", "stats"):
+            self.conn.execute(f"DELETE FROM {table}")
+        # Tasks keep their order keys; rows are read back in key order, ties
+        # in insertion (list) order
+        for category, task_list in data["tasks"].items():
+            for task in task_list:
+                self._insert_task(category, task)
+        for task in data["completed_tasks"]:
+            self._insert_completed(task)
+        self.saved_label_colors = {}
+        self._write_label_colors(data["label_colors"])
+        if data.get("stats") is not None:
+            self.conn.executemany(
+                "INSERT INTO stats (kind, key, value) VALUES (?, ?, ?)",
+                [(kind, key, json.dumps(value))
+                 for kind, entries in data["stats"].items() for key, value in entries.items()]
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats_built', '1')")
+
+
+# One-shot import of a tasks_data.json file into a SQLite database
+def migrate_json_to_sqlite(json_path, db):
+    sqlite_storage = db if isinstance(db, SqliteStorage) else SqliteStorage(db)
+    json_storage = JsonStorage(json_path)
+    data = json_storage.load()
+    with sqlite_storage.conn:
+        sqlite_storage._replace_all(data)
+        for month in data["archive"]:
+            for task in json_storage.load_archive(month):
+                sqlite_storage._insert_completed(task)
+        sqlite_storage.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+            (str(json_path),)
+        )
+    return sqlite_storage
@@ -0,0 +1,312 @@
+import hashlib
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+from export import export_tasks
+from importer import import_tasks
+from storage import (
+    CATEGORIES, TIMESTAMP_FORMAT, JsonStorage, JournalStorage, SharedStore, SqliteStorage,
+    due_ordinal, new_task_id, next_order_key, plan_move
+)
+
+STORAGE_BACKENDS = ["json", "journal", "sqlite"]
+
+# Boards are named task sets, each stored in its own directory (a shard) with
+# its own data files and lock. The default board lives in the partition
+# directory itself, so data written before boards existed is the default
+# board. Other boards live in boards/<name>/ below it. Per-user partitions
+# live in users/<user>/ below the data directory.
+DEFAULT_BOARD = "main"
+BOARDS_DIR = "boards"
+USERS_DIR = "users"
+
+
+# Storage backend by name: "json" rewrites data_file on every change,
+# "journal" appends to journal_file, "sqlite" keeps one row per task
+def open_storage(backend="json", data_file="tasks_data.json", journal_file="tasks_journal.jsonl",
+                 sqlite_file="tasks_data.db"):
+    if backend == "journal":
+        return JournalStorage(data_file, journal_file)
+    if backend == "sqlite":
+        # An existing data_file is imported once on first use
+        return SqliteStorage(sqlite_file, legacy_json_path=data_file)
+    if backend == "json":
+        return JsonStorage(data_file)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+# Storage for the board stored in directory, with the file names of open_storage
+def open_board_storage(backend, directory, data_file="tasks_data.json", journal_file="tasks_journal.jsonl",
+                       sqlite_file="tasks_data.db"):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    return open_storage(backend, directory / data_file, directory / journal_file, directory / sqlite_file)
+
+
+# Directory-safe board name: lower-case letters, digits and single dashes.
+# Empty if the name has none of those.
+def board_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")[:40].strip("-")
+
+
+# Directory name for a user id: a readable prefix plus a hash of the whole id,
+# so ids that differ only in case or punctuation are kept apart
+def user_slug(user):
+    digest = hashlib.sha256(str(user).encode("utf-8")).hexdigest()[:12]
+    prefix = board_slug(user)[:24].strip("-")
+    return f"{prefix}-{digest}" if prefix else digest
+
+
+# Directory holding a user's boards, or the shared boards when user is None
+def partition_dir(data_dir, user=None):
+    if user is None:
+        return Path(data_dir)
+    return Path(data_dir) / USERS_DIR / user_slug(user)
+
+
+# Directory of one board's data files
+def board_dir(data_dir, board=DEFAULT_BOARD, user=None):
+    slug = board_slug(board)
+    if not slug:
+        raise ValueError(f"Invalid board name: {board!r}")
+    root = partition_dir(data_dir, user)
+    return root if slug == DEFAULT_BOARD else root / BOARDS_DIR / slug
+
+
+# Board names of a partition, the default board first
+def list_boards(data_dir, user=None):
+    boards_dir = partition_dir(data_dir, user) / BOARDS_DIR
+    names = sorted(path.name for path in boards_dir.iterdir() if path.is_dir()) if boards_dir.is_dir() else []
+    return [DEFAULT_BOARD] + [name for name in names if name != DEFAULT_BOARD]
+
+
+# Create an empty board; returns its name as listed by list_boards
+def create_board(data_dir, board, user=None):
+    board_dir(data_dir, board, user).mkdir(parents=True, exist_ok=True)
+    return board_slug(board)
+
+
+# Days from today until a "YYYY-MM-DD" due date, or None without one
+def days_until_due(due_date_str, today=None):
+    due = due_ordinal(due_date_str)
+    if due is None:
+        return None
+    return due - (today or date.today()).toordinal()
+
+
+def is_overdue(due_date_str, today=None):
+    days_left = days_until_due(due_date_str, today)
+    return days_left is not None and days_left < 0
+
+
+# Due dates are stored as "YYYY-MM-DD"; dates and datetimes are accepted too
+def _due_date_string(due_date):
+    if not due_date:
+        return None
+    if isinstance(due_date, date):
+        return due_date.strftime("%Y-%m-%d")
+    return date.fromisoformat(str(due_date)[:10]).isoformat()
+
+
+def _now():
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+class TaskStore(SharedStore):
+    """Task operations on a shared data set, usable without Streamlit.
+
+    Every mutation is turned into operations and committed through
+    ``SharedStore.commit``, so it is persisted by whichever storage backend
+    the store was created with. Mutations return a false value when nothing
+    changed (unknown task, empty name, ...) and let storage errors propagate.
+
+        store = TaskStore(open_storage("sqlite"))
+        task_id = store.add_task("urgent_important", "Write report", due_date="2025-01-31")
+        store.complete_task("urgent_important", task_id)
+    """
+
+    # Add a task at the end of category; returns its id, or None if name is empty
+    def add_task(self, category, name, description="", due_date=None, labels=None):
+        if not name or not name.strip():
+            return None
+        with self.lock:
+            task = {
+                "id": new_task_id(),
+                "name": name.strip(),
+                "description": description.strip() if description else "",
+                "created_at": _now(),
+                "due_date": _due_date_string(due_date),
+                "priority": next_order_key(self.data["tasks"][category]),
+                "labels": list(labels) if labels else []
+            }
+            if self.commit([{"op": "add_task", "category": category, "task": task}]):
+                return task["id"]
+            return None
+
+    # Replace a task's fields; False if name is empty or the task is unknown
+    def edit_task(self, category, task_id, name, description="", due_date=None, labels=None):
+        if not name or not name.strip():
+            return False
+        return bool(self.commit([{
+            "op": "edit_task",
+            "category": category,
+            "task_id": task_id,
+            "fields": {
+                "name": name.strip(),
+                "description": description.strip() if description else "",
+                "due_date": _due_date_string(due_date),
+                "labels": list(labels) if labels else []
+            }
+        }]))
+
+    # Active task by id, or None
+    def get_task(self, category, task_id):
+        with self.lock:
+            return self.index.get_active(category, task_id)
+
+    # Position of an active task in its category, or None
+    def task_position(self, category, task_id):
+        with self.lock:
+            location = self.index.active.get(task_id)
+            if location is None or location[0] != category:
+                return None
+            return location[1]
+
+    # Move a task to a position (0-based) in to_category, or within its own category
+    def move_task_to(self, category, task_id, position, to_category=None):
+        with self.lock:
+            return bool(self.commit(plan_move(self.data, self.index, category, task_id,
+                                              to_category or category, position)))
+
+    # Move a task to the end of another category
+    def move_task(self, from_category, to_category, task_id):
+        with self.lock:
+            return self.move_task_to(from_category, task_id, len(self.data["tasks"][to_category]), to_category)
+
+    def move_task_up(self, category, task_id):
+        with self.lock:
+            position = self.task_position(category, task_id)
+            if not position:
+                return False
+            return self.move_task_to(category, task_id, position - 1)
+
+    def move_task_down(self, category, task_id):
+        with self.lock:
+            position = self.task_position(category, task_id)
+            if position is None:
+                return False
+            return self.move_task_to(category, task_id, position + 1)
+
+    def complete_task(self, category, task_id, completed_at=None):
+        return bool(self.commit([{
+            "op": "complete_task",
+            "category": category,
+            "task_id": task_id,
+            "completed_at": completed_at or _now()
+        }]))
+
+    def delete_task(self, category, task_id):
+        return bool(self.commit([{"op": "delete_task", "category": category, "task_id": task_id}]))
+
+    # Delete a completed task; archived tasks need the month they were archived under
+    def delete_completed_task(self, task_id, month=None):
+        return bool(self.delete_completed_tasks({task_id: month}))
+
+    # Bulk actions on tasks of one category. Each sends the whole selection
+    # as one batch of operations, persisted with a single write, and returns
+    # the number of tasks changed.
+    def bulk_complete_tasks(self, category, task_ids, completed_at=None):
+        completed_at = completed_at or _now()
+        return len(self.commit([
+            {"op": "complete_task", "category": category, "task_id": task_id, "completed_at": completed_at}
+            for task_id in task_ids
+        ]))
+
+    def bulk_delete_tasks(self, category, task_ids):
+        return len(self.commit([
+            {"op": "delete_task", "category": category, "task_id": task_id} for task_id in task_ids
+        ]))
+
+    # Move tasks to the end of to_category, keeping their current order
+    def bulk_move_tasks(self, from_category, to_category, task_ids):
+        with self.lock:
+            positions = {task_id: self.task_position(from_category, task_id) for task_id in task_ids}
+            ordered = sorted((task_id for task_id in task_ids if positions[task_id] is not None), key=positions.get)
+            priority = next_order_key(self.data["tasks"][to_category])
+            return len(self.commit([{
+                "op": "move_task",
+                "from_category": from_category,
+                "to_category": to_category,
+                "task_id": task_id,
+                "priority": priority + offset
+            } for offset, task_id in enumerate(ordered)]))
+
+    def bulk_relabel_tasks(self, category, task_ids, add_labels=(), remove_labels=()):
+        with self.lock:
+            ops = []
+            for task_id in task_ids:
+                task = self.index.get_active(category, task_id)
+                if task is None:
+                    continue
+                labels = [label for label in task.labels if label not in remove_labels]
+                labels += [label for label in add_labels if label not in labels]
+                if tuple(labels) == task.labels:
+                    continue
+                ops.append({
+                    "op": "edit_task",
+                    "category": category,
+                    "task_id": task_id,
+                    "fields": {
+                        "name": task["name"],
+                        "description": task["description"],
+                        "due_date": task["due_date"],
+                        "labels": labels
+                    }
+                })
+            return len(self.commit(ops))
+
+    # Labels used by at least one active task in category, sorted. A copy,
+    # so callers can iterate it while other sessions commit.
+    def category_labels(self, category):
+        with self.lock:
+            return sorted(self.index.category_labels(category))
+
+    # Active tasks in category carrying any (or all) of labels, in list order
+    def filter_tasks_by_labels(self, category, labels, match_all=False):
+        with self.lock:
+            return self.index.filter_by_labels(category, labels, match_all)
+
+    # Overview figures shown on the Statistics tab. Completed counts and
+    # times come from the stored aggregates, so the archive is not read.
+    def statistics(self):
+        with self.lock:
+            stats = self.data["stats"]
+            active = {category: len(self.data["tasks"][category]) for category in CATEGORIES}
+            # category -> [total days, number of tasks]
+            cat_times = stats["days_to_complete"]
+            timed_count = sum(count for _, count in cat_times.values())
+            return {
+                "active": active,
+                "active_total": sum(active.values()),
+                "completed": {category: stats["category"].get(category, 0) for category in CATEGORIES},
+                "completed_total": self.completed_count(),
+                "due": dict(self.due_buckets()["counts"]),
+                "average_days_to_complete": (
+                    sum(days for days, _ in cat_times.values()) / timed_count if timed_count else None
+                ),
+                "days_to_complete": {
+                    category: days / count for category, (days, count) in cat_times.items() if count
+                }
+            }
+
+    # Import a CSV, JSON or JSONL file object; see importer.import_tasks
+    def import_file(self, fileobj, import_format, default_category=None):
+        return import_tasks(self, fileobj, import_format, default_category)
+
+    # Export file contents as bytes; see export.export_tasks
+    def export(self, export_format, include_active=False, include_labels=False):
+        with self.lock:
+            completed = self.completed_tasks()
+            active = {category: list(task_list) for category, task_list in self.data["tasks"].items()} if include_active else None
+        return export_tasks(export_format, completed, active, include_labels)
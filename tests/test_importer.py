@@ -0,0 +1,146 @@
+import io
+import json
+
+import pytest
+
+from importer import RecordError, map_record, plan_import, read_records
+from task_store import TaskStore, open_storage
+
+NOW = "2024-06-01 12:00:00"
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def records(text, import_format):
+    return list(read_records(io.BytesIO(text.encode("utf-8")), import_format))
+
+
+# Mapping records to tasks
+
+def test_map_record_accepts_export_column_names():
+    task, category, completed_at = map_record({
+        "Task Name": " Write report ",
+        "Description": "Q2",
+        "Category": "Not Urgent & Important",
+        "Created": "2024-05-01 09:30:00",
+        "Completed": "2024-05-03",
+        "Labels": "work; writing"
+    }, now=NOW)
+
+    assert task["name"] == "Write report"
+    assert task["description"] == "Q2"
+    assert task["created_at"] == "2024-05-01 09:30:00"
+    assert task["labels"] == ["work", "writing"]
+    assert category == "not_urgent_important"
+    assert completed_at == "2024-05-03 00:00:00"
+
+
+def test_map_record_defaults():
+    task, category, completed_at = map_record({"title": "Call Bob", "tags": ["a", "b", "a"]},
+                                              default_category="urgent_important", now=NOW)
+
+    assert task["name"] == "Call Bob"
+    assert task["description"] == ""
+    assert task["created_at"] == NOW
+    assert task["due_date"] is None
+    assert task["labels"] == ["a", "b"]
+    assert category == "urgent_important"
+    assert completed_at is None
+
+
+@pytest.mark.parametrize("record, message", [
+    ({"name": " "}, "missing task name"),
+    ({"name": "x"}, "unknown quadrant"),
+    ({"name": "x", "quadrant": "someday"}, "unknown quadrant"),
+    ({"name": "x", "quadrant": "urgent_important", "due": "next week"}, "invalid due date"),
+    ({"name": "x", "quadrant": "urgent_important", "created": "yesterday"}, "invalid created date"),
+])
+def test_map_record_rejects_invalid_records(record, message):
+    with pytest.raises(RecordError, match=message):
+        map_record(record, now=NOW)
+
+
+def test_plan_import_keeps_valid_records_and_reports_the_rest():
+    rows, errors = plan_import([
+        {"name": "ok", "category": "urgent_important"},
+        "not a record",
+        {"name": ""},
+        {"name": "also ok"}
+    ], default_category="not_urgent_not_important")
+
+    assert [(category, task["name"]) for category, task, _ in rows] == [
+        ("urgent_important", "ok"), ("not_urgent_not_important", "also ok")
+    ]
+    assert errors == [(2, "not an object"), (3, "missing task name")]
+
+
+# Reading files
+
+def test_read_records_csv():
+    assert records("name,category\nfirst,urgent_important\nsecond,\n", "csv") == [
+        {"name": "first", "category": "urgent_important"},
+        {"name": "second", "category": ""}
+    ]
+
+
+def test_read_records_jsonl_skips_blank_lines():
+    assert records('{"name": "a"}\n\n{"name": "b"}\n', "jsonl") == [{"name": "a"}, {"name": "b"}]
+
+
+def test_read_records_json_list_and_data_file():
+    assert records('[{"name": "a"}]', "json") == [{"name": "a"}]
+    document = {
+        "tasks": {"urgent_important": [{"name": "active"}]},
+        "completed_tasks": [{"name": "done", "category": "not_urgent_important"}]
+    }
+    assert records(json.dumps(document), "json") == [
+        {"name": "active", "category": "urgent_important"},
+        {"name": "done", "category": "not_urgent_important"}
+    ]
+
+
+def test_read_records_unknown_format():
+    with pytest.raises(ValueError, match="Unknown import format"):
+        records("", "xml")
+
+
+@pytest.mark.parametrize("text, import_format", [
+    ("42", "json"),
+    ("[{", "json"),
+    ('{"name": "a"}\n{', "jsonl"),
+])
+def test_unreadable_files_import_nothing(text, import_format):
+    store = TaskStore(open_storage("json"))
+    with pytest.raises(ValueError, match="Could not read"):
+        store.import_file(io.BytesIO(text.encode("utf-8")), import_format)
+    assert all(not task_list for task_list in store.data["tasks"].values())
+
+
+# Export -> import round trip
+
+@pytest.mark.parametrize("export_format", ["CSV", "JSONL"])
+def test_export_can_be_imported_again(export_format):
+    source = TaskStore(open_storage("json", data_file="source.json"))
+    first = source.add_task("urgent_important", "first", "details", due_date="2024-07-01", labels=["work", "home"])
+    source.add_task("urgent_important", "second")
+    source.add_task("not_urgent_not_important", "later", labels=["home"])
+    source.complete_task("urgent_important", first, completed_at="2024-06-02 08:00:00")
+    exported = source.export(export_format, include_active=True, include_labels=True)
+
+    target = TaskStore(open_storage("json", data_file="target.json"))
+    imported, errors = target.import_file(io.BytesIO(exported), export_format.lower())
+
+    assert (imported, errors) == (3, [])
+    assert [task["name"] for task in target.data["tasks"]["urgent_important"]] == ["second"]
+    later = target.data["tasks"]["not_urgent_not_important"][0]
+    assert (later["name"], later["labels"]) == ("later", ["home"])
+    [done] = target.completed_tasks()
+    assert (done["name"], done["description"], done["category"]) == ("first", "details", "urgent_important")
+    assert done["completed_at"] == "2024-06-02 08:00:00"
+    assert done["due_date"] == "2024-07-01"
+    assert done["labels"] == ["work", "home"]
+    assert target.statistics()["completed_total"] == 1
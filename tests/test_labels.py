@@ -0,0 +1,50 @@
+import pytest
+
+from task_store import TaskStore, open_storage
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = TaskStore(open_storage("json"))
+    store.add_task("urgent_important", "both", labels=["work", "home"])
+    store.add_task("urgent_important", "work only", labels=["work"])
+    store.add_task("urgent_important", "home only", labels=["home"])
+    store.add_task("urgent_important", "none")
+    store.add_task("not_urgent_important", "elsewhere", labels=["work", "home"])
+    return store
+
+
+def filtered(store, labels, match_all=False, category="urgent_important"):
+    return [task["name"] for task in store.filter_tasks_by_labels(category, labels, match_all)]
+
+
+def test_any_label_matches_in_list_order(store):
+    assert filtered(store, ["home", "work"]) == ["both", "work only", "home only"]
+    assert filtered(store, ["home"]) == ["both", "home only"]
+
+
+def test_all_labels_must_match(store):
+    assert filtered(store, ["work", "home"], match_all=True) == ["both"]
+    assert filtered(store, ["work", "missing"], match_all=True) == []
+
+
+def test_no_labels_returns_the_whole_category(store):
+    assert filtered(store, []) == ["both", "work only", "home only", "none"]
+    assert filtered(store, [], match_all=True) == ["both", "work only", "home only", "none"]
+
+
+def test_unknown_labels_match_nothing(store):
+    assert filtered(store, ["missing"]) == []
+
+
+def test_filter_follows_edits_moves_and_completion(store):
+    tasks = {task["name"]: task for task in store.data["tasks"]["urgent_important"]}
+    store.edit_task("urgent_important", tasks["none"]["id"], "none", labels=["home"])
+    store.complete_task("urgent_important", tasks["both"]["id"])
+    store.move_task_to("urgent_important", tasks["home only"]["id"], 0)
+
+    assert filtered(store, ["home"]) == ["home only", "none"]
+    assert filtered(store, ["work", "home"], match_all=True) == []
+    assert filtered(store, ["work", "home"], match_all=True, category="not_urgent_important") == ["elsewhere"]
+    assert store.category_labels("urgent_important") == ["home", "work"]
@@ -0,0 +1,89 @@
+import math
+
+import pytest
+
+from storage import order_key_between, plan_move
+from task_store import STORAGE_BACKENDS, TaskStore, open_storage
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def names(store, category="urgent_important"):
+    return [task["name"] for task in store.data["tasks"][category]]
+
+
+def board(backend, task_names):
+    store = TaskStore(open_storage(backend))
+    ids = {name: store.add_task("urgent_important", name) for name in task_names}
+    return store, ids
+
+
+def test_order_key_between():
+    assert order_key_between(None, None) == 0
+    assert order_key_between(None, 3) == 2
+    assert order_key_between(None, 0.5) == -1
+    assert order_key_between(4, None) == 5
+    assert order_key_between(4.5, None) == 5
+    assert order_key_between(1, 2) == 1.5
+    # No float left between two adjacent keys
+    assert order_key_between(1.0, math.nextafter(1.0, 2.0)) is None
+
+
+def test_plan_move_only_rekeys_the_moved_task():
+    store, ids = board("json", ["a", "b", "c"])
+    ops = plan_move(store.data, store.index, "urgent_important", ids["c"], "urgent_important", 1)
+
+    assert ops == [{"op": "move_task", "from_category": "urgent_important", "to_category": "urgent_important",
+                    "task_id": ids["c"], "priority": 0.5}]
+
+
+def test_plan_move_ignores_no_op_moves():
+    store, ids = board("json", ["a", "b"])
+    assert plan_move(store.data, store.index, "urgent_important", ids["a"], "urgent_important", 0) == []
+    assert plan_move(store.data, store.index, "urgent_important", "missing", "urgent_important", 0) == []
+
+
+def test_plan_move_renumbers_when_keys_run_out():
+    store, ids = board("json", ["a", "b", "c"])
+    store.data["tasks"]["urgent_important"][1]["priority"] = math.nextafter(0.0, 1.0)
+    ops = plan_move(store.data, store.index, "urgent_important", ids["c"], "urgent_important", 1)
+
+    assert [op["op"] for op in ops] == ["renumber_tasks", "move_task"]
+    assert ops[1]["priority"] == 0.5
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_repeated_moves_keep_their_order_after_renumbering(backend):
+    store, ids = board(backend, ["a", "b", "c", "d"])
+    expected = names(store)
+    renumbered = 0
+    # Halving the gap above b's key runs out of floats after ~50 moves
+    for _ in range(60):
+        last = store.data["tasks"]["urgent_important"][-1]
+        ops = plan_move(store.data, store.index, "urgent_important", last["id"], "urgent_important", 2)
+        renumbered += ops[0]["op"] == "renumber_tasks"
+        assert store.move_task_to("urgent_important", last["id"], 2)
+        expected.insert(2, expected.pop())
+        assert names(store) == expected
+
+    assert renumbered
+    priorities = [task["priority"] for task in store.data["tasks"]["urgent_important"]]
+    assert priorities == sorted(set(priorities))
+    assert names(TaskStore(open_storage(backend))) == expected
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_move_between_categories(backend):
+    store, ids = board(backend, ["a", "b"])
+    store.add_task("not_urgent_important", "x")
+    store.add_task("not_urgent_important", "y")
+    store.move_task_to("urgent_important", ids["b"], 1, "not_urgent_important")
+
+    assert names(store) == ["a"]
+    assert names(store, "not_urgent_important") == ["x", "b", "y"]
+    restarted = TaskStore(open_storage(backend))
+    assert names(restarted, "not_urgent_important") == ["x", "b", "y"]
@@ -0,0 +1,99 @@
+from storage import SearchIndex, Task
+
+
+def index_of(*tasks):
+    index = SearchIndex()
+    for task_id, name, description, labels in tasks:
+        index.add(Task(task_id, name, description, labels=labels))
+    return index
+
+
+def test_name_matches_rank_above_description_matches():
+    index = index_of(
+        ("desc", "Weekly sync", "prepare the budget", ()),
+        ("name", "Budget review", "", ()),
+        ("other", "Call the bank", "", ())
+    )
+    assert index.search("budget") == ["name", "desc"]
+
+
+def test_rarer_words_weigh_more():
+    index = index_of(
+        ("many_reports", "report report invoice", "", ()),
+        ("many_invoices", "report invoice invoice", "", ()),
+        *((f"filler{number}", "report", "", ()) for number in range(3))
+    )
+    # "report" is in every task, "invoice" in two, so invoice counts more
+    assert index.search("report invoice") == ["many_invoices", "many_reports"]
+    assert index.search("report")[0] == "many_reports"
+
+
+def test_every_word_must_match():
+    index = index_of(
+        ("both", "Client report", "", ()),
+        ("one", "Client call", "", ())
+    )
+    assert index.search("client report") == ["both"]
+    assert index.search("report client") == ["both"]
+    assert index.search("client missing") == []
+
+
+def test_last_word_matches_as_prefix():
+    index = index_of(
+        ("migrate", "Migrate database", "", ()),
+        ("migration", "Write migration plan", "", ()),
+        ("might", "Might skip", "", ())
+    )
+    assert sorted(index.search("migr")) == ["migrate", "migration"]
+    assert sorted(index.search("mig")) == ["might", "migrate", "migration"]
+    # Only the last word is a prefix; earlier words match exactly
+    assert index.search("migr database") == []
+    assert index.search("migrate datab") == ["migrate"]
+
+
+def test_labels_and_case_are_searched():
+    index = index_of(("task", "Pay rent", "", ("Finance",)))
+    assert index.search("FINANCE") == ["task"]
+    assert index.search("pay fin") == ["task"]
+
+
+def test_limit_and_empty_query():
+    index = index_of(*((f"t{number}", "same words", "", ()) for number in range(5)))
+    assert len(index.search("same", limit=3)) == 3
+    assert index.search("   ") == []
+    assert index.search("") == []
+
+
+def test_removed_tasks_and_their_words_disappear():
+    index = index_of(
+        ("keep", "Shared word", "", ()),
+        ("drop", "Shared unique", "", ())
+    )
+    index.search("shared")
+    index.remove("drop")
+    assert index.search("shared") == ["keep"]
+    assert index.search("uniq") == []
+    assert "unique" not in index.vocabulary
+    # Removing an unknown id does nothing
+    index.remove("missing")
+    assert index.search("shared") == ["keep"]
+
+
+def test_readding_a_task_replaces_its_words():
+    index = index_of(("task", "Old title", "", ()))
+    index.search("old")
+    index.add(Task("task", "New title"))
+    assert index.search("old") == []
+    assert index.search("new") == ["task"]
+    assert index.vocabulary == sorted(index.postings)
+
+
+def test_vocabulary_stays_sorted_after_many_changes():
+    index = index_of(("base", "alpha", "", ()))
+    index.search("a")
+    for number in range(SearchIndex.VOCABULARY_PATCH_LIMIT * 2):
+        index.add(Task(f"t{number}", f"word{number:04d}"))
+    index.remove("base")
+    assert index.vocabulary == sorted(index.postings)
+    assert len(index.search("word")) == 50
+    assert index.search("word0007") == ["t7"]
@@ -0,0 +1,297 @@
+import gzip
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from storage import ARCHIVE_CACHE_MONTHS, SCHEMA_VERSION, compute_stats, read_json_file
+from task_store import STORAGE_BACKENDS, TaskStore, open_storage
+
+OLD = "2020-01-15 10:00:00"
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def open_store(backend, **options):
+    return TaskStore(open_storage(backend), **options)
+
+
+def names(store, category="urgent_important"):
+    return [task["name"] for task in store.data["tasks"][category]]
+
+
+def completed_names(store):
+    return sorted(task["name"] for task in store.completed_tasks())
+
+
+# Journal: operations are replayed on top of the snapshot after a crash
+
+def test_journal_replays_operations_after_restart():
+    store = open_store("journal")
+    first = store.add_task("urgent_important", "first")
+    store.add_task("urgent_important", "second")
+    store.complete_task("urgent_important", first)
+
+    # No compaction happened: the snapshot does not know about the tasks yet
+    assert not store.storage.path.exists() or not read_json_file(store.storage.path)["tasks"]["urgent_important"]
+    restarted = open_store("journal")
+    assert names(restarted) == ["second"]
+    assert completed_names(restarted) == ["first"]
+    assert restarted.statistics()["completed_total"] == 1
+
+
+def test_journal_skips_entries_already_in_the_snapshot():
+    store = open_store("journal")
+    store.add_task("urgent_important", "kept")
+    journal = store.storage.journal_path.read_bytes()
+    store.storage.compact(store.data)
+    # Crash between writing the snapshot and truncating the journal
+    store.storage.journal_path.write_bytes(journal)
+
+    assert names(open_store("journal")) == ["kept"]
+
+
+def test_journal_torn_tail_does_not_swallow_later_entries():
+    store = open_store("journal")
+    store.add_task("urgent_important", "before crash")
+    with open(store.storage.journal_path, "ab") as f:
+        f.write(b'{"seq": 2, "op": {"op": "add_ta')
+
+    restarted = open_store("journal")
+    assert names(restarted) == ["before crash"]
+    restarted.add_task("urgent_important", "after crash")
+    restarted.add_task("urgent_important", "later")
+
+    assert names(open_store("journal")) == ["before crash", "after crash", "later"]
+
+
+# Two writers on the same files keep each other's changes
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_concurrent_writers_merge(backend):
+    one = open_store(backend)
+    two = open_store(backend)
+    shared = one.add_task("urgent_important", "from one")
+    # two has not seen the new task; its commit is merged on top
+    two.add_task("not_urgent_important", "from two")
+    two.refresh()
+    two.complete_task("urgent_important", shared)
+
+    one.refresh()
+    for store in (one, open_store(backend)):
+        assert names(store, "not_urgent_important") == ["from two"]
+        assert names(store) == []
+        assert completed_names(store) == ["from one"]
+        assert store.statistics()["completed_total"] == 1
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_stale_operation_is_dropped_in_merge(backend):
+    one = open_store(backend)
+    task_id = one.add_task("urgent_important", "task")
+    two = open_store(backend)
+    one.delete_task("urgent_important", task_id)
+    # Completing a task another writer deleted does nothing
+    two.complete_task("urgent_important", task_id)
+
+    store = open_store(backend)
+    assert names(store) == []
+    assert store.completed_count() == 0
+
+
+# Files written before schema 2 are upgraded once
+
+def write_legacy_files(directory):
+    data = {
+        "tasks": {
+            "urgent_important": [
+                {"id": "a", "text": "legacy active", "created_at": "2024-05-01 09:00:00", "priority": 0}
+            ],
+            "not_urgent_important": [],
+            "urgent_not_important": [],
+            "not_urgent_not_important": []
+        },
+        "completed_tasks": [
+            {"id": "b", "text": "legacy done", "created_at": "2020-01-10 09:00:00",
+             "completed_at": OLD, "category": "urgent_important", "priority": 0}
+        ],
+        "label_colors": {"work": "#ff0000"}
+    }
+    (directory / "tasks_data.json").write_text(json.dumps(data, indent=2))
+
+
+def test_legacy_files_are_migrated_to_current_schema(data_dir):
+    write_legacy_files(data_dir)
+    store = open_store("json")
+
+    assert names(store) == ["legacy active"]
+    assert completed_names(store) == ["legacy done"]
+    saved = read_json_file(data_dir / "tasks_data.json")
+    assert saved["schema"] == SCHEMA_VERSION
+    assert saved["tasks"]["urgent_important"][0]["name"] == "legacy active"
+    assert "text" not in saved["tasks"]["urgent_important"][0]
+    assert saved["tasks"]["urgent_important"][0]["labels"] == []
+    assert saved["stats"]["category"] == {"urgent_important": 1}
+    assert saved["label_colors"] == {"work": "#ff0000"}
+    # The old completed task is moved into a compressed archive segment
+    assert saved["completed_tasks"] == []
+    assert saved["archive"] == {"2020-01": 1}
+    archive = data_dir / "tasks_data_archive"
+    segment = json.loads(gzip.decompress((archive / "completed_2020-01.json.gz").read_bytes()))
+    assert segment["schema"] == SCHEMA_VERSION
+    assert segment["tasks"][0]["name"] == "legacy done"
+    # Nothing left to migrate on the next start
+    assert open_store("json").storage.schema == SCHEMA_VERSION
+
+
+def test_legacy_files_are_imported_into_sqlite(data_dir):
+    write_legacy_files(data_dir)
+    store = open_store("sqlite")
+
+    assert names(store) == ["legacy active"]
+    assert completed_names(store) == ["legacy done"]
+    assert store.statistics()["completed_total"] == 1
+
+
+# Archived tasks: deleting them keeps the archive counts and aggregates right
+
+def archived_store(backend):
+    store = open_store(backend)
+    for name in ("old one", "old two", "recent"):
+        task_id = store.add_task("urgent_important", name)
+        store.complete_task("urgent_important", task_id,
+                            completed_at=None if name == "recent" else OLD)
+    # Tasks completed long ago are moved to the archive on the next load
+    return open_store(backend)
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_old_completed_tasks_are_archived(backend):
+    store = archived_store(backend)
+
+    assert [task["name"] for task in store.data["completed_tasks"]] == ["recent"]
+    assert store.data["archive"] == {"2020-01": 2}
+    assert completed_names(store) == ["old one", "old two", "recent"]
+    assert store.completed_count() == 3
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_deleting_archived_task_keeps_stats_consistent(backend):
+    store = archived_store(backend)
+    old = next(task for task in store.completed_tasks() if task["name"] == "old one")
+
+    assert store.delete_completed_tasks({old["id"]: "2020-01"})
+    for current in (store, open_store(backend)):
+        assert completed_names(current) == ["old two", "recent"]
+        assert current.data["archive"] == {"2020-01": 1}
+        assert current.statistics()["completed_total"] == 2
+        assert current.data["stats"] == compute_stats(current.completed_tasks())
+        assert not current.rebuild_stats()
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_deleting_last_archived_task_drops_the_month(backend):
+    store = archived_store(backend)
+    months = {task["id"]: "2020-01" for task in store.completed_tasks() if task["name"].startswith("old")}
+
+    assert len(store.delete_completed_tasks(months)) == 2
+    current = open_store(backend)
+    assert current.data["archive"] == {}
+    assert completed_names(current) == ["recent"]
+    assert current.data["stats"] == compute_stats(current.completed_tasks())
+
+
+# Full rewrites of the data set keep changes made by other writers
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_rebuild_stats_keeps_other_writers_changes(backend):
+    behind = open_store(backend)
+    writer = open_store(backend)
+    task_id = writer.add_task("urgent_important", "other writer")
+    writer.complete_task("urgent_important", task_id)
+
+    assert not behind.rebuild_stats()
+    for store in (behind, open_store(backend)):
+        assert completed_names(store) == ["other writer"]
+        assert store.data["stats"] == compute_stats(store.completed_tasks())
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_save_keeps_other_writers_changes(backend):
+    behind = open_store(backend)
+    open_store(backend).add_task("urgent_important", "other writer")
+    behind.set_label_color("home", "#00ff00")
+
+    behind.save()
+    for store in (behind, open_store(backend)):
+        assert names(store) == ["other writer"]
+        assert store.data["label_colors"]["home"] == "#00ff00"
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_refresh_archives_tasks_without_reload(backend, monkeypatch):
+    store = open_store(backend)
+    old_id = store.add_task("urgent_important", "back-dated")
+    store.complete_task("urgent_important", old_id, completed_at=OLD)
+    recent_id = store.add_task("urgent_important", "recent")
+    store.complete_task("urgent_important", recent_id)
+
+    store.refresh()
+    assert [task["name"] for task in store.data["completed_tasks"]] == ["recent"]
+    assert store.data["archive"] == {"2020-01": 1}
+
+    # Days later the cutoff moves past the other task as well
+    later = date.today() + timedelta(days=1)
+    monkeypatch.setattr(store, "_archive_cutoff", later.isoformat)
+    store.refresh()
+    assert store.data["completed_tasks"] == []
+    assert store.data["archive"] == {"2020-01": 1, date.today().strftime("%Y-%m"): 1}
+    assert completed_names(store) == ["back-dated", "recent"]
+
+
+def test_archive_cache_is_bounded(monkeypatch):
+    store = open_store("json")
+    months = [f"{2019 + number // 12}-{number % 12 + 1:02d}" for number in range(ARCHIVE_CACHE_MONTHS + 3)]
+    for month in months:
+        task_id = store.add_task("urgent_important", month)
+        store.complete_task("urgent_important", task_id, completed_at=f"{month}-15 10:00:00")
+    store.refresh()
+    assert sorted(store.data["archive"]) == months
+
+    read = []
+    load_archive = store.storage.load_archive
+    monkeypatch.setattr(store.storage, "load_archive", lambda month: read.append(month) or load_archive(month))
+    # A few recent months are cached
+    store.completed_tasks(since=months[-2])
+    store.completed_tasks(since=months[-2])
+    assert read == months[-2:]
+    assert list(store._archive_cache) == months[-2:]
+
+    # A full scan reads around the cache instead of evicting it
+    read.clear()
+    assert completed_names(store) == months
+    assert read == months[:-2]
+    assert list(store._archive_cache) == months[-2:]
+
+    # Deleting an archived task reads only its own month
+    read.clear()
+    task = next(task for task in store.completed_tasks(since=months[-2]) if task["name"] == months[-2])
+    store.delete_completed_tasks({task["id"]: months[-2]})
+    assert set(read) <= {months[-2]}
+    assert months[-2] not in store.data["archive"]
+
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_order_survives_full_save(backend):
+    store = open_store(backend)
+    a, b, c = (store.add_task("urgent_important", name) for name in "ABC")
+    store.move_task_to("urgent_important", c, 0)
+    store.save()
+    store.move_task_to("urgent_important", b, 1)
+
+    assert names(store) == ["C", "B", "A"]
+    assert names(open_store(backend)) == ["C", "B", "A"]